@@ -0,0 +1,83 @@
+"""
+Compare the streaming DOCX extractor against the previous python-docx object-model path.
+
+Each extractor runs in a fresh process so the peak RSS it adds on top of the
+imports can be measured.
+
+Usage:
+    python -m benchmarks.bench_docx --paragraphs 200000 --tables 200
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import make_docx
+from benchmarks.measure import peak_rss_mb
+from docx import Document
+from logic.extraction import iter_docx_segments
+
+
+def legacy_extract(file_path: Path) -> int:
+    """The python-docx path the streaming extractor replaced; returns the character count."""
+    doc = Document(file_path)
+    parts = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
+    for table in doc.tables:
+        for row in table.rows:
+            parts.extend(cell.text.strip() for cell in row.cells if cell.text.strip())
+    for section in doc.sections:
+        parts.extend(p.text.strip() for p in section.header.paragraphs if p.text.strip())
+        parts.extend(p.text.strip() for p in section.footer.paragraphs if p.text.strip())
+    return sum(len(part) for part in parts)
+
+
+def streaming_extract(file_path: Path) -> int:
+    """Consume the segment stream without holding on to it; returns the character count."""
+    return sum(len(segment.text) for segment in iter_docx_segments(file_path))
+
+
+def run_child(method: str, file_path: str):
+    extract = legacy_extract if method == "legacy" else streaming_extract
+    baseline_mb = peak_rss_mb()
+    started = time.perf_counter()
+    chars = extract(Path(file_path))
+    print(json.dumps({
+        "seconds": time.perf_counter() - started,
+        "chars": chars,
+        "extra_rss_mb": peak_rss_mb() - baseline_mb,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=50000)
+    parser.add_argument("--tables", type=int, default=100)
+    parser.add_argument("--child", nargs=2, metavar=("METHOD", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docx_path = make_docx(Path(tmp) / "large.docx", args.paragraphs, args.tables)
+        size_mb = docx_path.stat().st_size / (1024 * 1024)
+        print(f"Synthetic DOCX: {args.paragraphs} paragraphs, {args.tables} tables, {size_mb:.1f} MB")
+        rows = {}
+        for method in ("legacy", "streaming"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_docx", "--child", method, str(docx_path)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            rows[method] = json.loads(output.strip().splitlines()[-1])
+            row = rows[method]
+            print(f"{method:<10} {row['seconds']:8.2f}s  extra peak RSS {row['extra_rss_mb']:8.1f} MB  {row['chars']} chars")
+
+    print(f"speedup {rows['legacy']['seconds'] / rows['streaming']['seconds']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
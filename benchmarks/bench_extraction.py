@@ -0,0 +1,238 @@
+"""
+End-to-end extraction benchmark over a deterministic synthetic corpus.
+
+Generates text PDFs, scanned PDFs, DOCX files with tables, a WAV recording and
+a PNG screenshot, runs `extract_text_from_file` on each in a fresh process
+(no extraction cache, cold imports) and records wall time, CPU time, peak RSS
+and characters/s. Every run is appended to a JSON history file and compared
+with the previous run made with the same parameters on the same machine;
+metrics that got worse by more than `--threshold` are flagged.
+
+Usage:
+    python -m benchmarks.bench_extraction
+    python -m benchmarks.bench_extraction --wav-seconds 300 --repeat 3 --fail-on-regression
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import make_docx, make_png_screenshot, make_scanned_pdf, make_text_pdf, make_wav
+from benchmarks.measure import peak_rss_mb
+
+DEFAULT_HISTORY = Path(__file__).resolve().parent / "results" / "extraction_history.json"
+
+# Higher is worse for these; chars_per_second is checked the other way round.
+COST_METRICS = ("wall_seconds", "cpu_seconds", "peak_rss_mb")
+
+
+def build_corpus(directory: Path, args) -> dict:
+    """Write the corpus into `directory` and return {case name: file path}."""
+    cases = {
+        "text_pdf": lambda p: make_text_pdf(p, args.pdf_pages, seed=args.seed),
+        "scanned_pdf": lambda p: make_scanned_pdf(p, args.scanned_pages, seed=args.seed),
+        "docx_tables": lambda p: make_docx(p, args.docx_paragraphs, tables=args.docx_tables, seed=args.seed),
+        "wav": lambda p: make_wav(p, args.wav_seconds, seed=args.seed),
+        "png_screenshot": lambda p: make_png_screenshot(p, seed=args.seed),
+    }
+    extensions = {"text_pdf": ".pdf", "scanned_pdf": ".pdf", "docx_tables": ".docx", "wav": ".wav", "png_screenshot": ".png"}
+    corpus = {}
+    for name in args.cases:
+        corpus[name] = cases[name](directory / f"{name}{extensions[name]}")
+    return corpus
+
+
+def run_child(file_path: str):
+    """Extract one file and report what only the child itself can measure."""
+    from logic.extraction import extract_text_from_file
+
+    started = time.perf_counter()
+    text = extract_text_from_file(Path(file_path))
+    print(json.dumps({
+        "seconds": time.perf_counter() - started,
+        "chars": len(text),
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def _children_cpu_seconds() -> float:
+    """CPU time of reaped child processes; 0 on Windows, which has no RUSAGE_CHILDREN."""
+    if sys.platform == "win32":
+        return 0.0
+    import resource  # POSIX only
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def measure_case(file_path: Path) -> dict:
+    """
+    Run one extraction in a fresh interpreter.
+
+    CPU time is measured from the parent via RUSAGE_CHILDREN, so it includes
+    the child's own worker processes (PDF page pool, transcription workers,
+    ffmpeg, tesseract) once they have been reaped; it is not measured on
+    Windows. Peak RSS is the child's own.
+    """
+    cpu_before = _children_cpu_seconds()
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_extraction", "--child", str(file_path)],
+        capture_output=True, text=True,
+    )
+    wall_seconds = time.perf_counter() - started
+    cpu_seconds = _children_cpu_seconds() - cpu_before
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else f"exit {completed.returncode}"
+        return {"error": error}
+    child = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {
+        "wall_seconds": wall_seconds,
+        "extract_seconds": child["seconds"],
+        "cpu_seconds": cpu_seconds,
+        "peak_rss_mb": child["peak_rss_mb"],
+        "chars": child["chars"],
+        "chars_per_second": child["chars"] / child["seconds"] if child["seconds"] else 0.0,
+    }
+
+
+def median_run(file_path: Path, repeat: int) -> dict:
+    runs = [measure_case(file_path) for _ in range(repeat)]
+    failed = [run for run in runs if "error" in run]
+    if failed:
+        return failed[0]
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def load_history(path: Path) -> list:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def save_history(path: Path, history: list):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    tmp_path.replace(path)
+
+
+def find_baseline(history: list, run: dict):
+    """The most recent earlier run with the same corpus parameters on the same host."""
+    for previous in reversed(history):
+        if previous["params"] == run["params"] and previous["host"] == run["host"]:
+            return previous
+    return None
+
+
+def find_regressions(baseline: dict, run: dict, threshold: float) -> list:
+    """Return human-readable descriptions of every metric that got worse by more than `threshold`."""
+    regressions = []
+    for case, current in run["results"].items():
+        previous = baseline["results"].get(case)
+        if not previous or "error" in previous or "error" in current:
+            continue
+        for metric in COST_METRICS:
+            if previous[metric] > 0 and current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(
+                    f"{case}: {metric} {previous[metric]:.2f} -> {current[metric]:.2f} "
+                    f"(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)"
+                )
+        before, after = previous["chars_per_second"], current["chars_per_second"]
+        if before > 0 and after < before * (1 - threshold):
+            regressions.append(f"{case}: chars_per_second {before:.0f} -> {after:.0f} (-{(1 - after / before) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=["text_pdf", "scanned_pdf", "docx_tables", "wav", "png_screenshot"])
+    parser.add_argument("--pdf-pages", type=int, default=100)
+    parser.add_argument("--scanned-pages", type=int, default=5)
+    parser.add_argument("--docx-paragraphs", type=int, default=5000)
+    parser.add_argument("--docx-tables", type=int, default=20)
+    parser.add_argument("--wav-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the median is recorded")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--child", metavar="FILE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "params": {
+            "cases": sorted(args.cases),
+            "pdf_pages": args.pdf_pages,
+            "scanned_pages": args.scanned_pages,
+            "docx_paragraphs": args.docx_paragraphs,
+            "docx_tables": args.docx_tables,
+            "wav_seconds": args.wav_seconds,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(Path(tmp), args)
+        print(f"{'case':<16}{'size MB':>9}{'wall s':>9}{'cpu s':>9}{'peak MB':>9}{'chars/s':>12}")
+        for name, file_path in corpus.items():
+            size_mb = file_path.stat().st_size / (1024 * 1024)
+            result = median_run(file_path, args.repeat)
+            result["size_mb"] = size_mb
+            run["results"][name] = result
+            if "error" in result:
+                print(f"{name:<16}{size_mb:>9.1f}  FAILED: {result['error']}")
+            else:
+                print(
+                    f"{name:<16}{size_mb:>9.1f}{result['wall_seconds']:>9.2f}{result['cpu_seconds']:>9.2f}"
+                    f"{result['peak_rss_mb']:>9.0f}{result['chars_per_second']:>12.0f}"
+                )
+
+    history = load_history(args.history)
+    baseline = find_baseline(history, run)
+    history.append(run)
+    save_history(args.history, history)
+    print(f"\nRecorded run {len(history)} in {args.history}")
+
+    if baseline is None:
+        print("No previous run with these parameters; this run is the baseline.")
+        return
+    regressions = find_regressions(baseline, run, args.threshold)
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} against {baseline['commit']} ({baseline['timestamp']}).")
+        return
+    print(f"Regressions beyond {args.threshold:.0%} against {baseline['commit']} ({baseline['timestamp']}):")
+    for line in regressions:
+        print(f"  {line}")
+    if args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Check that importing the extraction module stays cheap.
+
+Runs `python -X importtime -c "import logic.extraction"` in a fresh interpreter
+and fails if the import pulls in a heavy extraction backend or takes longer
+than `--max-ms`. Heavy backends must only be imported when a file of their
+format is first extracted.
+
+Usage:
+    python -m benchmarks.bench_import_time --max-ms 200
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES = ("whisper", "torch", "numpy", "fitz", "pymupdf", "pdfplumber", "pdf2image",
+                 "pytesseract", "tesserocr", "docx", "lxml", "PIL")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure(module: str) -> tuple:
+    """Return (cumulative import time in ms, set of top-level packages imported)."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    total_us = 0
+    imported = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        name = name.strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            total_us = int(cumulative)
+    return total_us / 1000, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="logic.extraction")
+    parser.add_argument("--max-ms", type=float, default=200.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    best_ms = min(ms for ms, _ in runs)
+    heavy = sorted(set().union(*(imported for _, imported in runs)) & set(HEAVY_MODULES))
+
+    print(f"import {args.module}: {best_ms:.1f} ms (best of {args.repeat})")
+    failures = []
+    if heavy:
+        failures.append(f"heavy backends imported eagerly: {', '.join(heavy)}")
+    if best_ms > args.max_ms:
+        failures.append(f"import took {best_ms:.1f} ms, limit is {args.max_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Measure the per-call latency saved by reusing one pooled Groq client.
+
+Runs entirely offline against a local HTTPS mock of the chat completions
+endpoint (with a throwaway self-signed certificate from the `openssl` CLI).
+"per-call" builds a new client for every request, as `get_groq_client()` used
+to; "pooled" reuses the process-wide client and its keep-alive connections.
+`--rtt-ms` adds simulated network round trips: two per new connection (TCP
+and TLS 1.3 handshakes) and one per request.
+
+Usage:
+    python -m benchmarks.bench_llm_client --calls 50 --rtt-ms 20
+"""
+import argparse
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from logic.llm_client import GroqClientManager
+
+COMPLETION = {
+    "id": "chatcmpl-mock",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "llama3-8b-8192",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+def make_certificate(directory: Path):
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1", "-keyout", str(key), "-out", str(cert)],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.rtt)
+        body = json.dumps(COMPLETION).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, ssl_context: ssl.SSLContext, rtt: float):
+        super().__init__(("127.0.0.1", 0), MockHandler)
+        self.ssl_context = ssl_context
+        self.rtt = rtt
+
+    def get_request(self):
+        sock, address = self.socket.accept()
+        time.sleep(2 * self.rtt)  # TCP and TLS handshakes
+        return self.ssl_context.wrap_socket(sock, server_side=True), address
+
+
+def call(manager: GroqClientManager):
+    client = manager.get()
+    client.chat.completions.create(
+        model="llama3-8b-8192",
+        messages=[{"role": "user", "content": "ping"}],
+        max_tokens=1,
+    )
+
+
+def run(mode: str, calls: int, base_url: str, verify: ssl.SSLContext) -> tuple:
+    timings = []
+    pooled = GroqClientManager(base_url=base_url, verify=verify)
+    for _ in range(calls):
+        manager = pooled if mode == "pooled" else GroqClientManager(base_url=base_url, verify=verify)
+        started = time.perf_counter()
+        call(manager)
+        timings.append(time.perf_counter() - started)
+        if manager is not pooled:
+            manager.close()
+    stats = pooled.stats()
+    pooled.close()
+    return timings, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated network round-trip time")
+    args = parser.parse_args()
+
+    os.environ["GROQ_API_KEY"] = "mock-key"
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_certificate(Path(tmp))
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_context.load_cert_chain(cert, key)
+        client_context = ssl.create_default_context(cafile=str(cert))
+
+        server = MockServer(server_context, args.rtt_ms / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"https://127.0.0.1:{server.server_address[1]}"
+        try:
+            call(GroqClientManager(base_url=base_url, verify=client_context))  # import groq/httpx before timing
+            print(f"Mock endpoint {base_url}, {args.calls} calls, simulated RTT {args.rtt_ms:.0f} ms")
+            results = {mode: run(mode, args.calls, base_url, client_context) for mode in ("per-call", "pooled")}
+        finally:
+            server.shutdown()
+
+    for mode, (timings, _) in results.items():
+        ms = sorted(t * 1000 for t in timings)
+        print(f"{mode:<10} mean {statistics.mean(ms):7.2f} ms  p50 {ms[len(ms) // 2]:7.2f} ms  max {ms[-1]:7.2f} ms")
+    saved = statistics.mean(results["per-call"][0]) - statistics.mean(results["pooled"][0])
+    stats = results["pooled"][1]
+    print(f"Saved per call: {saved * 1000:.2f} ms")
+    print(
+        f"Pooled client: {stats['client_builds']} build(s), {stats['requests']} requests, "
+        f"{stats['reused_connections']} on reused connections ({stats['reuse_rate']:.0%}), "
+        f"{stats['tls_handshakes']} TLS handshake(s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
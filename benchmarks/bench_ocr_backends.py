@@ -0,0 +1,61 @@
+"""
+Compare OCR throughput (pages/second) of the available OCR backends.
+
+Usage:
+    python -m benchmarks.bench_ocr_backends --pages 20
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from benchmarks.corpus import make_text_pdf
+from logic.ocr import create_ocr_backend
+
+
+def render_pages(pdf_path: Path, dpi: int) -> list:
+    images = []
+    with fitz.open(str(pdf_path)) as doc:
+        for page in doc:
+            pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            images.append(Image.frombytes("L", (pix.width, pix.height), pix.samples))
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--backends", nargs="+", default=["pytesseract", "tesserocr"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_text_pdf(Path(tmp) / "pages.pdf", args.pages)
+        images = render_pages(pdf_path, args.dpi)
+
+    results = {}
+    for name in args.backends:
+        try:
+            backend = create_ocr_backend(name)
+        except Exception as e:
+            print(f"{name:<12} unavailable: {e}")
+            continue
+        try:
+            backend.image_to_text(images[0])  # warm-up: first call loads traineddata
+            started = time.perf_counter()
+            chars = sum(len(backend.image_to_text(image)) for image in images)
+            elapsed = time.perf_counter() - started
+        finally:
+            backend.close()
+        results[name] = len(images) / elapsed
+        print(f"{name:<12} {results[name]:6.2f} pages/s  ({elapsed:.2f}s, {chars} chars)")
+
+    if "pytesseract" in results and "tesserocr" in results:
+        print(f"tesserocr speedup: {results['tesserocr'] / results['pytesseract']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Check that OCR of scanned PDFs runs in bounded memory.
+
+Each page count is extracted in a fresh process so peak RSS is measured
+independently. The run fails if peak RSS for the largest document grows more
+than `--tolerance` over the smallest one.
+
+Usage:
+    python -m benchmarks.bench_ocr_memory --pages 10 40 160
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import make_text_pdf
+from benchmarks.measure import peak_rss_mb
+
+
+def run_child(pdf_path: str):
+    from logic.pdf import extract_pdf_pages
+
+    started = time.perf_counter()
+    pages = extract_pdf_pages(Path(pdf_path), max_workers=1)
+    print(json.dumps({
+        "pages": len(pages),
+        "ocr_pages": sum(1 for p in pages if p.method == "ocr"),
+        "seconds": time.perf_counter() - started,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 40, 160])
+    parser.add_argument("--memory-mb", type=int, default=256, help="OCR memory ceiling passed to the pipeline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative RSS growth")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sorted(args.pages):
+            pdf_path = make_text_pdf(Path(tmp) / f"scanned_{count}.pdf", count, scanned_every=1)
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_ocr_memory", "--child", str(pdf_path)],
+                capture_output=True, text=True, check=True,
+                env={**os.environ, "PDF_OCR_MEMORY_MB": str(args.memory_mb)},
+            ).stdout
+            row = json.loads(output.strip().splitlines()[-1])
+            rows.append(row)
+            print(f"{count:>5} pages  {row['seconds']:8.2f}s  peak RSS {row['peak_rss_mb']:8.1f} MB")
+
+    baseline, largest = rows[0]["peak_rss_mb"], rows[-1]["peak_rss_mb"]
+    growth = (largest - baseline) / baseline
+    print(f"peak RSS growth {rows[0]['pages']} -> {rows[-1]['pages']} pages: {growth:+.1%}")
+    assert growth <= args.tolerance, f"peak RSS grew {growth:.1%}, more than {args.tolerance:.0%}"
+
+
+if __name__ == "__main__":
+    main()
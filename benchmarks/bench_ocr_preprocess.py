@@ -0,0 +1,117 @@
+"""
+Measure OCR time and character accuracy with and without image preprocessing.
+
+The fixtures are synthetic screenshots and scans with known text: a plain
+screenshot, a 4K screenshot, a thumbnail, a dark-mode screenshot, a skewed
+screenshot and a noisy, skewed page scan.
+
+Usage:
+    python -m benchmarks.bench_ocr_preprocess --repeat 3
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from benchmarks.corpus import make_text_pdf, render_screenshot
+from logic.ocr import get_ocr_backend
+from logic.preprocess import preprocess_for_ocr
+
+
+def scanned_page(seed: int = 0):
+    """A text PDF page rendered at 150 dpi, tilted 2 degrees, with sensor noise."""
+    import tempfile
+    from pathlib import Path
+
+    import fitz  # PyMuPDF
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_text_pdf(Path(tmp) / "page.pdf", 1, seed=seed)
+        with fitz.open(str(pdf_path)) as doc:
+            page = doc.load_page(0)
+            truth = page.get_text()
+            pix = page.get_pixmap(dpi=150, colorspace=fitz.csGRAY)
+            image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    image = image.rotate(2, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    noise = np.random.default_rng(seed).normal(0, 18, (image.height, image.width))
+    noisy = np.clip(np.asarray(image, dtype=np.float32) - 30 + noise, 0, 255).astype(np.uint8)
+    return Image.fromarray(noisy), truth
+
+
+def build_fixtures(seed: int) -> dict:
+    screenshot, truth = render_screenshot(seed, dpi=100)
+    four_k, _ = render_screenshot(seed, dpi=288)  # 3840 px wide
+    thumbnail, _ = render_screenshot(seed, dpi=45)
+    return {
+        "screenshot": (screenshot, truth),
+        "screenshot_4k": (four_k, truth),
+        "thumbnail": (thumbnail, truth),
+        "dark_mode": (ImageOps.invert(screenshot), truth),
+        "skewed_3deg": (screenshot.rotate(3, resample=Image.BICUBIC, expand=True, fillcolor=(255, 255, 255)), truth),
+        "scanned_page": scanned_page(seed),
+    }
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def character_accuracy(text: str, truth: str) -> float:
+    """1 - CER on whitespace-normalized text, floored at 0."""
+    text, truth = _normalize(text), _normalize(truth)
+    if not truth:
+        return 1.0 if not text else 0.0
+    return max(0.0, 1.0 - edit_distance(text, truth) / len(truth))
+
+
+def run(image, truth: str, preprocess: bool, repeat: int) -> tuple:
+    backend = get_ocr_backend()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        prepared = preprocess_for_ocr(image) if preprocess else image
+        text = backend.image_to_text(prepared)
+        timings.append(time.perf_counter() - started)
+    return min(timings), character_accuracy(text, truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per fixture; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    fixtures = build_fixtures(args.seed)
+    backend = get_ocr_backend()
+    backend.image_to_text(fixtures["screenshot"][0])  # load the engine before timing
+    print(f"OCR backend: {backend.name}")
+    print(f"{'fixture':<15}{'size':>12}{'raw s':>9}{'raw acc':>9}{'prep s':>9}{'prep acc':>10}")
+    totals = np.zeros(4)
+    for name, (image, truth) in fixtures.items():
+        raw_seconds, raw_accuracy = run(image, truth, False, args.repeat)
+        prep_seconds, prep_accuracy = run(image, truth, True, args.repeat)
+        totals += (raw_seconds, raw_accuracy, prep_seconds, prep_accuracy)
+        size = f"{image.width}x{image.height}"
+        print(f"{name:<15}{size:>12}{raw_seconds:>9.2f}{raw_accuracy:>9.1%}{prep_seconds:>9.2f}{prep_accuracy:>10.1%}")
+    count = len(fixtures)
+    print(
+        f"{'total/mean':<15}{'':>12}{totals[0]:>9.2f}{totals[1] / count:>9.1%}"
+        f"{totals[2]:>9.2f}{totals[3] / count:>10.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare memory-mapped text ingestion against the previous read-everything path.
+
+Writes a large UTF-8 log with a single latin-1 byte near the end, the case
+where the old reader decoded the whole file, failed, and read it all again as
+latin-1. Each method runs in a fresh process so the peak RSS it adds can be
+measured.
+
+Usage:
+    python -m benchmarks.bench_text_ingest --mb 300
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import lorem
+from benchmarks.measure import peak_rss_mb
+
+
+def make_log(path: Path, megabytes: int, seed: int = 0) -> Path:
+    rng = random.Random(seed)
+    lines = [f"2024-01-01 12:00:{i % 60:02d} INFO {lorem(rng, 12)} – ok\n" for i in range(5000)]
+    block = "".join(lines).encode("utf-8")
+    target = megabytes * 1024 * 1024
+    with open(path, "wb") as f:
+        written = 0
+        while written < target:
+            f.write(block)
+            written += len(block)
+        f.write(b"caf\xe9 closed\n")  # not UTF-8
+    return path
+
+
+def legacy_extract(file_path: Path) -> int:
+    """The reader `extract_text_from_text` used to be; returns the character count."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return len(f.read().strip())
+    except UnicodeDecodeError:
+        with open(file_path, "r", encoding="latin-1") as f:
+            return len(f.read().strip())
+
+
+def streaming_extract(file_path: Path) -> int:
+    """Consume the pieces without keeping them, as a streaming consumer would."""
+    from logic.textfile import iter_text_pieces
+
+    return sum(len(piece) for piece in iter_text_pieces(file_path))
+
+
+def whole_extract(file_path: Path) -> int:
+    from logic.extraction import extract_text_from_text
+
+    return len(extract_text_from_text(file_path))
+
+
+METHODS = {"legacy": legacy_extract, "streaming": streaming_extract, "whole": whole_extract}
+
+
+def run_child(method: str, file_path: str):
+    baseline_mb = peak_rss_mb()
+    started = time.perf_counter()
+    chars = METHODS[method](Path(file_path))
+    print(json.dumps({
+        "seconds": time.perf_counter() - started,
+        "chars": chars,
+        "extra_rss_mb": peak_rss_mb() - baseline_mb,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=200)
+    parser.add_argument("--child", nargs=2, metavar=("METHOD", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = make_log(Path(tmp) / "large.log", args.mb)
+        size_mb = log_path.stat().st_size / (1024 * 1024)
+        print(f"Synthetic log: {size_mb:.0f} MB")
+        for method in METHODS:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_text_ingest", "--child", method, str(log_path)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            row = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{method:<10} {row['seconds']:7.2f}s  {size_mb / row['seconds']:7.0f} MB/s  "
+                f"extra peak RSS {row['extra_rss_mb']:8.1f} MB  {row['chars']} chars"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Measure how much transcription time the VAD pre-pass saves.
+
+Each file is decoded once, then transcribed in-process with and without VAD
+using the same warm Whisper model. Reports the speech ratio found by VAD and
+the transcription speedup.
+
+Usage:
+    python -m benchmarks.bench_vad "ProjectStorage/uploads/MP3 Project Online Learn.mp3"
+"""
+import argparse
+import time
+from pathlib import Path
+
+from logic.audio import SAMPLE_RATE, decode_audio
+from logic.transcription import _transcribe_samples, _transcribe_speech_only
+from logic.vad import detect_speech, speech_ratio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--model", default="base")
+    args = parser.parse_args()
+
+    for file_path in args.files:
+        samples = decode_audio(file_path)
+        duration = len(samples) / SAMPLE_RATE
+
+        started = time.perf_counter()
+        regions = detect_speech(samples)
+        vad_seconds = time.perf_counter() - started
+        ratio = speech_ratio(samples, regions)
+
+        _transcribe_samples(args.model, samples[: SAMPLE_RATE])  # warm the model
+        started = time.perf_counter()
+        full = _transcribe_samples(args.model, samples)
+        full_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        speech_only = _transcribe_speech_only(args.model, samples)
+        vad_total_seconds = time.perf_counter() - started
+
+        print(f"{file_path.name}")
+        print(f"  duration       {duration:8.1f}s   speech ratio {ratio:6.1%} ({len(regions)} regions, VAD {vad_seconds * 1000:.0f} ms)")
+        print(f"  without VAD    {full_seconds:8.2f}s   {len(full['text'])} chars")
+        print(f"  with VAD       {vad_total_seconds:8.2f}s   {len(speech_only['text'])} chars")
+        print(f"  speedup        {full_seconds / max(vad_total_seconds, 1e-9):8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Deterministic synthetic inputs for the extraction benchmarks."""
+import random
+from pathlib import Path
+
+
+_WORDS = (
+    "user login password cart checkout product inventory order payment address "
+    "button page error message validate submit cancel confirm total price item "
+    "quantity shipping account profile logout search filter sort review"
+).split()
+
+
+def lorem(rng: random.Random, words: int) -> str:
+    """Return `words` pseudo-random requirement-ish words."""
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def make_text_pdf(path: Path, pages: int, scanned_every: int = 0, seed: int = 0) -> Path:
+    """
+    Write a `pages`-page PDF with a native text layer.
+
+    With `scanned_every=N`, every Nth page is replaced by an image-only
+    rendering of the same text to simulate a scanned page.
+    """
+    import fitz  # PyMuPDF
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        lines = [f"Requirement {page_number + 1}.{i + 1}: {lorem(rng, 10)}" for i in range(40)]
+        page.insert_textbox(fitz.Rect(50, 50, 560, 800), "\n".join(lines), fontsize=10)
+        if scanned_every and (page_number + 1) % scanned_every == 0:
+            pix = page.get_pixmap(dpi=150)
+            doc.delete_page(page_number)
+            page = doc.new_page(pno=page_number)
+            page.insert_image(page.rect, pixmap=pix)
+    doc.save(str(path))
+    doc.close()
+    return Path(path)
+
+
+def make_docx(path: Path, paragraphs: int, tables: int = 0, rows: int = 20, seed: int = 0) -> Path:
+    """Write a DOCX with `paragraphs` paragraphs and `tables` tables (with merged cells) spread through it."""
+    from docx import Document
+
+    rng = random.Random(seed)
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Synthetic requirements"
+    table_every = max(1, paragraphs // tables) if tables else 0
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Paragraph {i + 1}: {lorem(rng, 30)}")
+        if table_every and (i + 1) % table_every == 0:
+            table = doc.add_table(rows=rows, cols=4)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"R{r}C{c} {lorem(rng, 4)}"
+            table.cell(0, 0).merge(table.cell(0, 1))
+            table.cell(1, 3).merge(table.cell(rows - 1, 3))
+    doc.save(str(path))
+    return Path(path)
+
+
+def make_scanned_pdf(path: Path, pages: int, seed: int = 0) -> Path:
+    """Write a PDF whose pages are all image-only (no text layer)."""
+    return make_text_pdf(path, pages, scanned_every=1, seed=seed)
+
+
+def render_screenshot(seed: int = 0, dpi: int = 100):
+    """
+    Render an app-like screenshot: a title bar, form labels and a table.
+
+    Returns:
+        (PIL image, the text drawn on it) -- the text is the OCR ground truth.
+    """
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    page = doc.new_page(width=960, height=600)
+    page.draw_rect(fitz.Rect(0, 0, 960, 48), color=None, fill=(0.2, 0.3, 0.5))
+    page.insert_text((20, 32), "Swag Labs - Checkout", fontsize=18, color=(1, 1, 1))
+    for i, label in enumerate(("First Name", "Last Name", "Postal Code")):
+        y = 90 + i * 50
+        page.insert_text((40, y), label, fontsize=12)
+        page.draw_rect(fitz.Rect(180, y - 16, 480, y + 6), color=(0.6, 0.6, 0.6))
+    for row in range(8):
+        y = 270 + row * 36
+        page.draw_line((40, y - 24), (920, y - 24), color=(0.85, 0.85, 0.85))
+        page.insert_text((40, y), f"Item {row + 1}  {lorem(rng, 6)}  ${rng.randint(5, 99)}.99", fontsize=12)
+    truth = page.get_text()
+    pix = page.get_pixmap(dpi=dpi)
+    image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    doc.close()
+    return image, truth
+
+
+def make_png_screenshot(path: Path, seed: int = 0, dpi: int = 100) -> Path:
+    """Write a PNG that looks like an app screenshot (see `render_screenshot`)."""
+    image, _ = render_screenshot(seed, dpi)
+    image.save(str(path))
+    return Path(path)
+
+
+def make_wav(path: Path, seconds: float, seed: int = 0, sample_rate: int = 16000) -> Path:
+    """
+    Write a mono 16-bit WAV of syllable-like voiced bursts separated by pauses.
+
+    It is not intelligible speech; it gives the decoder, VAD and Whisper a
+    realistic amount of voiced and silent audio to chew through.
+    """
+    import wave
+
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    samples = rng.normal(0, 0.003, total).astype(np.float32)  # room noise
+    position = 0
+    while position < total:
+        burst = int(rng.uniform(0.8, 3.0) * sample_rate)
+        end = min(total, position + burst)
+        t = np.arange(end - position) / sample_rate
+        pitch = rng.uniform(100, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.5 * (1 - np.cos(2 * np.pi * rng.uniform(3, 6) * t))  # ~syllable rate
+        samples[position:end] += (0.2 * voice * envelope).astype(np.float32)
+        position = end + int(rng.uniform(0.3, 1.5) * sample_rate)
+
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+    return Path(path)
@@ -0,0 +1,118 @@
+import logging
+import subprocess
+import threading
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper expects 16 kHz mono float32 PCM.
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2  # s16le
+# How long ffmpeg may take to exit after closing its output.
+FFMPEG_EXIT_TIMEOUT = 10.0
+
+
+def _ffmpeg_decode_command(file_path: Path) -> list:
+    return [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+        "-i", str(file_path),
+        "-vn", "-f", "s16le", "-acodec", "pcm_s16le",
+        "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "pipe:1",
+    ]
+
+
+def _read_exact(stream, size: int) -> bytes:
+    """Read up to `size` bytes, only returning short at end of stream."""
+    buf = bytearray()
+    while len(buf) < size:
+        block = stream.read(size - len(buf))
+        if not block:
+            break
+        buf.extend(block)
+    return bytes(buf)
+
+
+def _pcm_to_float(raw: bytes) -> np.ndarray:
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def iter_audio_chunks(
+    file_path: Path, chunk_seconds: float = 60, overlap_seconds: float = 0.0
+) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Decode the audio track of `file_path` once and yield it in fixed-size chunks.
+
+    A single ffmpeg process decodes the whole stream to 16 kHz mono PCM on a
+    pipe; chunks are sliced from that stream in memory, so there are no temp
+    files and no repeated seeks into the container. With `overlap_seconds`,
+    every chunk after the first is prefixed with the tail of the previous one
+    so words straddling a cut appear whole in at least one chunk.
+
+    Yields:
+        (start_seconds, samples) tuples where `samples` is a float32 NumPy array
+        that can be passed straight to `model.transcribe`.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails to decode the input.
+    """
+    chunk_bytes = int(chunk_seconds * SAMPLE_RATE) * BYTES_PER_SAMPLE
+    command = _ffmpeg_decode_command(file_path)
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    # Drain stderr in the background so a chatty ffmpeg can never block on a full pipe.
+    stderr_chunks = []
+    stderr_thread = threading.Thread(
+        target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+    )
+    stderr_thread.start()
+
+    overlap_samples = int(overlap_seconds * SAMPLE_RATE)
+    offset_samples = 0
+    tail = np.zeros(0, dtype=np.float32)
+    reached_eof = False
+    try:
+        while True:
+            raw = _read_exact(process.stdout, chunk_bytes)
+            if len(raw) < BYTES_PER_SAMPLE:
+                reached_eof = True
+                break
+            raw = raw[: len(raw) - len(raw) % BYTES_PER_SAMPLE]
+            samples = _pcm_to_float(raw)
+            if len(tail):
+                yield (offset_samples - len(tail)) / SAMPLE_RATE, np.concatenate([tail, samples])
+            else:
+                yield offset_samples / SAMPLE_RATE, samples
+            offset_samples += len(samples)
+            if overlap_samples:
+                tail = samples[-overlap_samples:]
+    finally:
+        if reached_eof:
+            # ffmpeg closes stdout a moment before it exits; let it finish to get its real exit code.
+            try:
+                process.wait(timeout=FFMPEG_EXIT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                logger.warning(f"ffmpeg did not exit {FFMPEG_EXIT_TIMEOUT:g}s after finishing {file_path}; killing it")
+        if process.poll() is None:
+            # The caller stopped early (or ffmpeg hung): don't wait for the rest of the decode.
+            process.stdout.close()
+            process.kill()
+        returncode = process.wait()
+        stderr_thread.join(timeout=5)
+
+    if returncode != 0:
+        stderr = b"".join(c for c in stderr_chunks if c).decode("utf-8", errors="replace")
+        raise subprocess.CalledProcessError(returncode, command, stderr=stderr)
+
+    logger.info(f"Decoded {offset_samples / SAMPLE_RATE:.2f}s of audio from {file_path}")
+
+
+def decode_audio(file_path: Path) -> np.ndarray:
+    """Decode the whole audio track of `file_path` into a float32 16 kHz mono array."""
+    chunks = [samples for _, samples in iter_audio_chunks(file_path, chunk_seconds=600)]
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(chunks)
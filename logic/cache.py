@@ -0,0 +1,299 @@
+import atexit
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from logic.util import get_project_root
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXTRACTION_CACHE_MB = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+DEFAULT_LLM_CACHE_MB = int(os.getenv("LLM_CACHE_MAX_MB", "64"))
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+# Access times from cache hits are written to the index with the next change, or after this many hits.
+ACCESS_FLUSH_HITS = 32
+
+
+def hash_file(file_path: Path, block_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(*parts) -> str:
+    """Build a stable cache key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write `data` to `path` so readers (in any process) see the old file or the new one, never a partial one."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def _file_lock(path: Path):
+    """Hold an exclusive lock on `path` (created if missing) across processes."""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class DiskCache:
+    """
+    Content-addressed on-disk cache with a JSON index and an LRU size cap.
+
+    Values are stored as one file per key under `root`; `index.json` records
+    their size and last access time so the least recently used entries can be
+    evicted once the total size exceeds `max_bytes`. With `ttl_seconds`,
+    entries older than that are treated as missing and removed.
+
+    Several processes may share one root (the extraction sandbox, the daemon
+    and ingest workers all write to the caches): every access takes a lock
+    file and re-reads `index.json` if another process changed it, so no
+    process overwrites entries it hasn't seen. A hit does not rewrite the
+    index: access times are kept in memory and saved with the next change, or
+    every ACCESS_FLUSH_HITS hits.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, suffix: str = ".bin", ttl_seconds: Optional[float] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.ttl_seconds = ttl_seconds
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.root / "index.json"
+        self._lock_path = self.root / "index.lock"
+        self._lock = threading.Lock()
+        self._index = {}
+        self._index_signature = None
+        self._accessed = {}  # key -> last access time not yet saved to the index
+        self._unsaved_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        atexit.register(self.flush)
+
+    def _index_stat(self):
+        try:
+            stat = self._index_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Lock the cache against other threads and processes, with the index brought up to date."""
+        with self._lock, _file_lock(self._lock_path):
+            signature = self._index_stat()
+            if signature is None or signature != self._index_signature:
+                self._index = self._load_index()
+                self._index_signature = signature
+                for key, accessed in self._accessed.items():
+                    if key in self._index:
+                        self._index[key]["last_access"] = max(self._index[key]["last_access"], accessed)
+            yield
+
+    def _save_index(self):
+        atomic_write(self._index_path, json.dumps(self._index).encode("utf-8"))
+        self._index_signature = self._index_stat()
+        self._accessed.clear()
+        self._unsaved_hits = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{self.suffix}"
+
+    def _is_expired(self, entry: dict, now: float) -> bool:
+        return self.ttl_seconds is not None and now - entry["created"] > self.ttl_seconds
+
+    def _adopt_locked(self, key: str) -> Optional[dict]:
+        """Index a value file that exists on disk without an entry (e.g. left by an older version)."""
+        try:
+            stat = self._path(key).stat()
+        except OSError:
+            return None
+        entry = {"size": stat.st_size, "created": stat.st_mtime, "last_access": stat.st_mtime}
+        self._index[key] = entry
+        return entry
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._locked():
+            entry = self._index.get(key) or self._adopt_locked(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._is_expired(entry, time.time()):
+                del self._index[key]
+                self._remove_file(key)
+                self._save_index()
+                self.expired += 1
+                self.misses += 1
+                return None
+            try:
+                data = self._path(key).read_bytes()
+            except OSError:
+                # Index and files drifted apart (e.g. manual cleanup); forget the entry.
+                del self._index[key]
+                self._save_index()
+                self.misses += 1
+                return None
+            entry["last_access"] = self._accessed[key] = time.time()
+            self._unsaved_hits += 1
+            if self._unsaved_hits >= ACCESS_FLUSH_HITS:
+                self._save_index()
+            self.hits += 1
+            return data
+
+    def flush(self):
+        """Save access times recorded by hits since the index was last written (also run at exit)."""
+        if not self._accessed:
+            return
+        try:
+            with self._locked():
+                if self._accessed:
+                    self._save_index()
+        except OSError as e:
+            logger.warning(f"Could not save {self.root.name} cache access times: {str(e)}")
+
+    def set(self, key: str, data: bytes, **metadata):
+        with self._locked():
+            atomic_write(self._path(key), data)
+            self._index[key] = {
+                "size": len(data),
+                "created": time.time(),
+                "last_access": time.time(),
+                **metadata,
+            }
+            self._evict_locked()
+            self._save_index()
+
+    def delete(self, key: str):
+        with self._locked():
+            if self._index.pop(key, None) is not None:
+                self._remove_file(key)
+                self._save_index()
+
+    def _remove_file(self, key: str):
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _evict_locked(self):
+        if self.ttl_seconds is not None:
+            now = time.time()
+            for key in [k for k, entry in self._index.items() if self._is_expired(entry, now)]:
+                del self._index[key]
+                self._remove_file(key)
+                self.expired += 1
+        total = sum(entry["size"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index.pop(key)["size"]
+            self._remove_file(key)
+            logger.info(f"Evicted cache entry {key[:12]} from {self.root.name} cache")
+
+    def stats(self) -> dict:
+        with self._locked():
+            return {
+                "entries": len(self._index),
+                "bytes": sum(entry["size"] for entry in self._index.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+            }
+
+
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> DiskCache:
+    """Return the shared extraction cache under ProjectStorage/cache/extraction."""
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            root = get_project_root() / "ProjectStorage" / "cache" / "extraction"
+            _extraction_cache = DiskCache(root, DEFAULT_EXTRACTION_CACHE_MB * 1024 * 1024, suffix=".txt")
+        return _extraction_cache
+
+
+_manifest_cache = None
+
+
+def get_manifest_cache() -> DiskCache:
+    """Return the shared store of per-document extraction manifests under ProjectStorage/cache/manifests."""
+    global _manifest_cache
+    with _extraction_cache_lock:
+        if _manifest_cache is None:
+            root = get_project_root() / "ProjectStorage" / "cache" / "manifests"
+            # Manifests hold the unit texts too, so give them the same budget as the extraction cache.
+            _manifest_cache = DiskCache(root, DEFAULT_EXTRACTION_CACHE_MB * 1024 * 1024, suffix=".json")
+        return _manifest_cache
+
+
+_transcript_cache = None
+
+
+def get_transcript_cache() -> DiskCache:
+    """Return the shared store of timestamped transcripts under ProjectStorage/cache/transcripts."""
+    global _transcript_cache
+    with _extraction_cache_lock:
+        if _transcript_cache is None:
+            root = get_project_root() / "ProjectStorage" / "cache" / "transcripts"
+            _transcript_cache = DiskCache(root, DEFAULT_EXTRACTION_CACHE_MB * 1024 * 1024, suffix=".npz")
+        return _transcript_cache
+
+
+_llm_cache = None
+
+
+def get_llm_cache() -> DiskCache:
+    """Return the shared cache of LLM responses under ProjectStorage/cache/llm."""
+    global _llm_cache
+    with _extraction_cache_lock:
+        if _llm_cache is None:
+            root = get_project_root() / "ProjectStorage" / "cache" / "llm"
+            _llm_cache = DiskCache(
+                root, DEFAULT_LLM_CACHE_MB * 1024 * 1024, suffix=".txt", ttl_seconds=LLM_CACHE_TTL_HOURS * 3600,
+            )
+        return _llm_cache
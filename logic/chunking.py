@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Without tiktoken, tokens are estimated from characters. English prose averages
+# about 4 characters per token for Llama 3's tokenizer; 3.5 leaves headroom for
+# numbers, code and non-English text.
+CHARS_PER_TOKEN = 3.5
+# Estimates are raised by this fraction, since code and tables can tokenize
+# denser than 3.5 characters per token and a chunk must not overflow the window.
+ESTIMATE_MARGIN = 0.15
+# Chunks are packed to at least this fraction of the budget before they may end
+# early, at a section heading or after a paragraph whose hash is divisible by
+# BOUNDARY_DIVISOR, so boundaries follow the content without wasting requests.
+MIN_FILL = 0.75
+BOUNDARY_DIVISOR = 4
+
+# A line that starts a section: Markdown headings, numbered headings ("2.1 Login"),
+# "Chapter/Section/Part N" and short ALL-CAPS titles.
+_SECTION_START = re.compile(
+    r"^(#{1,6}\s|\d+(\.\d+)*\.?\s+[A-Z]|(?i:chapter|section|part)\s+\w+|[A-Z][A-Z0-9 &/,:()-]{2,60}$)"
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        # Llama 3's tokenizer is a 128k tiktoken BPE; cl100k_base counts within a few percent of it.
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        logger.info("tiktoken not available; estimating token counts from characters")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Number of tokens `text` takes in the model's context.
+
+    Without tiktoken this is a deliberately high estimate (see ESTIMATE_MARGIN).
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN * (1 + ESTIMATE_MARGIN))
+
+
+def _is_section_start(paragraph: str) -> bool:
+    first_line = paragraph.lstrip().split("\n", 1)[0].strip()
+    return bool(first_line) and bool(_SECTION_START.match(first_line))
+
+
+def _split_oversized(text: str, max_tokens: int) -> List[str]:
+    """Split one paragraph that doesn't fit: on lines, then sentences, then words."""
+    for pattern in ("\n", _SENTENCE_END, " "):
+        parts = text.split(pattern) if isinstance(pattern, str) else pattern.split(text)
+        parts = [part for part in parts if part.strip()]
+        if len(parts) > 1:
+            break
+    else:
+        # A single unbroken run (e.g. a base64 blob): cut by characters.
+        size = max(1, int(max_tokens * CHARS_PER_TOKEN))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    separator = pattern if isinstance(pattern, str) else " "
+    pieces, current, current_tokens = [], [], 0
+    for part in parts:
+        part_tokens = count_tokens(part) + 1  # plus the separator
+        if current and current_tokens + part_tokens > max_tokens:
+            pieces.append(separator.join(current))
+            current, current_tokens = [], 0
+        current.append(part)
+        current_tokens += part_tokens
+    if current:
+        pieces.append(separator.join(current))
+    result = []
+    for piece in pieces:
+        result.extend(_split_oversized(piece, max_tokens) if count_tokens(piece) > max_tokens else [piece])
+    return result
+
+
+def _units(text: str, max_tokens: int) -> List[str]:
+    """Paragraphs of `text`, with any paragraph over `max_tokens` split further."""
+    units = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) > max_tokens:
+            units.extend(_split_oversized(paragraph, max_tokens))
+        else:
+            units.append(paragraph)
+    return units
+
+
+def _is_content_boundary(unit: str) -> bool:
+    digest = hashlib.sha256(unit.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % BOUNDARY_DIVISOR == 0
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split `text` into chunks of at most `max_tokens`, on section and paragraph boundaries.
+
+    Paragraphs are packed in order. A chunk closes before a paragraph that
+    would overflow it or, once it is MIN_FILL full, before a section heading
+    or after a paragraph whose hash marks a boundary. Chunks therefore come
+    close to the budget (few requests), and their boundaries mostly depend on
+    the nearby text rather than on everything before it, so an edit usually
+    changes only the chunks around it and the rest keep the same content (and hash).
+    """
+    min_tokens = int(max_tokens * MIN_FILL)
+    chunks, current, current_tokens = [], [], 0
+    for unit in _units(text, max_tokens):
+        unit_tokens = count_tokens(unit) + 1  # plus the blank line joining it to the previous one
+        starts_section = _is_section_start(unit)
+        if current and (
+            current_tokens + unit_tokens > max_tokens or (starts_section and current_tokens >= min_tokens)
+        ):
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+        if current_tokens >= min_tokens and _is_content_boundary(unit):
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -0,0 +1,372 @@
+import argparse
+import hashlib
+import logging
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+import uuid
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Optional
+
+from logic.util import get_project_root
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = int(os.getenv("EXTRACTION_DAEMON_CONCURRENCY", "2"))
+DEFAULT_QUEUE_SIZE = int(os.getenv("EXTRACTION_DAEMON_QUEUE_SIZE", "32"))
+# Finished jobs are kept this long so sessions can still collect their results.
+JOB_RETENTION_SECONDS = 3600
+PREVIEW_CHARS = 2000
+
+
+def _run_dir() -> Path:
+    run_dir = get_project_root() / "ProjectStorage" / "run"
+    run_dir.mkdir(parents=True, exist_ok=True)
+    return run_dir
+
+
+def daemon_address():
+    """Socket address the daemon listens on (a Unix socket, or a named pipe on Windows)."""
+    if sys.platform == "win32":
+        return r"\\.\pipe\qa-assistant-extraction"
+    address = str(_run_dir() / "extraction.sock")
+    if len(address) > 100:
+        # Unix socket paths are limited to ~104 bytes; fall back to a short per-project path.
+        digest = hashlib.sha256(address.encode("utf-8")).hexdigest()[:12]
+        address = f"/tmp/qa-assistant-{digest}.sock"
+    return address
+
+
+def _authkey(create: bool = False) -> Optional[bytes]:
+    key_path = _run_dir() / "daemon.key"
+    if create:
+        key = secrets.token_bytes(32)
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+    try:
+        return key_path.read_bytes()
+    except OSError:
+        return None
+
+
+class ExtractionDaemon:
+    """
+    Long-lived local extraction service.
+
+    Streamlit reruns `ui/app.py` on every interaction, so work done inline in
+    the UI process is tied to whichever script run triggered it. The daemon
+    keeps Whisper, the OCR engine and the PDF worker pool warm in one process,
+    accepts jobs from any number of sessions over a local socket, runs at most
+    `concurrency` of them at a time and queues up to `queue_size` more.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.concurrency = concurrency
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = {}
+        self._cancel_events = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    # --- jobs ---
+    def submit(self, file_path: str) -> dict:
+        if not Path(file_path).is_file():
+            return {"ok": False, "error": f"File not found: {file_path}"}
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "file": str(file_path),
+            "status": "queued",
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+            "segments": 0,
+            "preview": "",
+            "text": None,
+            "complete": None,
+            "stop_reason": None,
+            "changes": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._cancel_events[job_id] = threading.Event()
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+                del self._cancel_events[job_id]
+            return {"ok": False, "error": "Extraction queue is full, try again shortly"}
+        logger.info(f"Queued extraction job {job_id[:8]} for {file_path}")
+        return {"ok": True, "job_id": job_id, "queue_position": self._queue.qsize()}
+
+    def status(self, job_id: str, include_text: bool = True) -> dict:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {"ok": False, "error": f"Unknown job: {job_id}"}
+            job = dict(job)
+        if not include_text:
+            job.pop("text", None)
+            job.pop("changes", None)
+        return {"ok": True, **job}
+
+    def cancel(self, job_id: str) -> dict:
+        """Stop a queued or running job; a running one keeps the segments it finished."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {"ok": False, "error": f"Unknown job: {job_id}"}
+            event = self._cancel_events.get(job_id)
+        if event is not None:
+            event.set()
+            logger.info(f"Cancelling extraction job {job_id[:8]}")
+        return {"ok": True, "status": job["status"]}
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"ok": True, "concurrency": self.concurrency, "queued": self._queue.qsize(), "jobs": counts}
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    @staticmethod
+    def _extract(file_path: Path, cancel: threading.Event, on_segment) -> dict:
+        """
+        Extract a job's file the way the UI does: incrementally when an earlier
+        version has a manifest, otherwise in full, recording a manifest for next time.
+        """
+        from logic.incremental import extract_incremental, has_manifest, record_manifest
+        from logic.limits import extract_with_limits
+
+        # Heavy formats run in a killable sandbox, so a pathological file
+        # only costs its own budget, not this worker.
+        if has_manifest(file_path):
+            incremental = extract_incremental(file_path, cancel=cancel, on_segment=on_segment)
+            return {
+                "text": incremental.text,
+                "complete": incremental.complete,
+                "stop_reason": incremental.stop_reason,
+                "changes": incremental.to_dict() if incremental.complete else None,
+            }
+        outcome = extract_with_limits(file_path, cancel=cancel, on_segment=on_segment)
+        if outcome.complete:
+            record_manifest(file_path, outcome.segments)
+        return {"text": outcome.text, "complete": outcome.complete, "stop_reason": outcome.stop_reason}
+
+    def _worker(self):
+        from logic.extraction import join_segments
+
+        while not self._stopping.is_set():
+            try:
+                job_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._lock:
+                file_path = self._jobs[job_id]["file"]
+                cancel = self._cancel_events[job_id]
+            if cancel.is_set():
+                self._update(
+                    job_id, status="cancelled", complete=False, stop_reason="cancelled",
+                    error="Extraction job was cancelled before it started", finished=time.time(),
+                )
+                with self._lock:
+                    self._cancel_events.pop(job_id, None)
+                self._queue.task_done()
+                continue
+            self._update(job_id, status="running", started=time.time())
+            segments = []
+
+            def on_segment(segment, job_id=job_id, segments=segments):
+                segments.append(segment)
+                preview = join_segments(segments[-20:])[-PREVIEW_CHARS:]
+                self._update(job_id, segments=len(segments), preview=preview)
+
+            try:
+                result = self._extract(Path(file_path), cancel, on_segment)
+                self._update(job_id, status="done", finished=time.time(), **result)
+                if result["complete"]:
+                    logger.info(f"Extraction job {job_id[:8]} finished")
+                else:
+                    logger.warning(f"Extraction job {job_id[:8]} stopped early ({result['stop_reason']})")
+            except Exception as e:
+                logger.error(f"Extraction job {job_id[:8]} failed: {str(e)}", exc_info=True)
+                self._update(job_id, status="failed", error=str(e), finished=time.time())
+            finally:
+                with self._lock:
+                    self._cancel_events.pop(job_id, None)
+                self._queue.task_done()
+
+    def _reaper(self):
+        while not self._stopping.wait(60):
+            cutoff = time.time() - JOB_RETENTION_SECONDS
+            with self._lock:
+                for job_id in [j for j, job in self._jobs.items() if job["finished"] and job["finished"] < cutoff]:
+                    del self._jobs[job_id]
+                    self._cancel_events.pop(job_id, None)
+
+    # --- transport ---
+    def _handle(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "submit":
+            return self.submit(request["path"])
+        if op == "status":
+            return self.status(request["job_id"], request.get("include_text", True))
+        if op == "cancel":
+            return self.cancel(request["job_id"])
+        if op == "stats":
+            return self.stats()
+        return {"ok": False, "error": f"Unknown operation: {op}"}
+
+    def _serve_connection(self, conn):
+        with conn:
+            while not self._stopping.is_set():
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    response = self._handle(request)
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                try:
+                    conn.send(response)
+                except (EOFError, OSError, BrokenPipeError):
+                    return  # the client went away mid-request
+
+    def warm_up(self):
+        """Start one extraction sandbox per worker, with its backends loaded, before the first job arrives."""
+        from logic.limits import warm_sandboxes
+
+        warm_sandboxes(self.concurrency)
+
+    def serve_forever(self, warm: bool = True):
+        address = daemon_address()
+        if sys.platform != "win32" and os.path.exists(address):
+            os.unlink(address)  # stale socket from a previous run
+        listener = Listener(address, authkey=_authkey(create=True))
+        logger.info(f"Extraction daemon listening on {address} (concurrency {self.concurrency})")
+
+        for i in range(self.concurrency):
+            threading.Thread(target=self._worker, name=f"extract-{i}", daemon=True).start()
+        threading.Thread(target=self._reaper, name="job-reaper", daemon=True).start()
+        if warm:
+            threading.Thread(target=self.warm_up, name="warm-up", daemon=True).start()
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # A client that fails the auth handshake must not take the daemon down.
+                    logger.warning(f"Rejected daemon connection: {str(e)}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self._stopping.set()
+            listener.close()
+
+
+class ExtractionClient:
+    """Submit extraction jobs to a running daemon and poll for their results."""
+
+    def __init__(self, timeout: float = 2.0):
+        self._conn = self._connect()
+        self._lock = threading.Lock()
+        self.timeout = timeout
+
+    @staticmethod
+    def _connect():
+        authkey = _authkey()
+        if authkey is None:
+            raise ConnectionError("Extraction daemon is not running")
+        return Client(daemon_address(), authkey=authkey)
+
+    def _call(self, **request) -> dict:
+        with self._lock:
+            self._conn.send(request)
+            if not self._conn.poll(self.timeout):
+                # The late reply would be read as the answer to the next call; drop the connection with it.
+                self._conn.close()
+                self._conn = self._connect()
+                raise TimeoutError("Extraction daemon did not respond")
+            return self._conn.recv()
+
+    def ping(self) -> dict:
+        return self._call(op="ping")
+
+    def submit(self, file_path: Path) -> str:
+        response = self._call(op="submit", path=str(Path(file_path).resolve()))
+        if not response["ok"]:
+            raise Exception(response["error"])
+        return response["job_id"]
+
+    def status(self, job_id: str, include_text: bool = False) -> dict:
+        return self._call(op="status", job_id=job_id, include_text=include_text)
+
+    def cancel(self, job_id: str) -> dict:
+        return self._call(op="cancel", job_id=job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll_interval: float = 0.5) -> str:
+        """
+        Block until a job finishes and return its text.
+
+        A job cancelled while running finishes as "done" with the text extracted
+        so far; one cancelled before it started has no text and raises.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id, include_text=True)
+            if not job["ok"]:
+                raise Exception(job["error"])
+            if job["status"] == "done":
+                return job["text"]
+            if job["status"] in ("failed", "cancelled"):
+                raise Exception(job["error"])
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Extraction job {job_id} did not finish in {timeout}s")
+            time.sleep(poll_interval)
+
+    def close(self):
+        self._conn.close()
+
+
+def connect_to_daemon() -> Optional[ExtractionClient]:
+    """Return a client for the running daemon, or None when it isn't running."""
+    try:
+        client = ExtractionClient()
+        client.ping()
+        return client
+    except Exception:
+        return None
+
+
+def main():
+    from logic.util import setup_logging, setup_storage
+
+    parser = argparse.ArgumentParser(description="Run the warm extraction daemon.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--no-warm", action="store_true", help="don't preload Whisper/OCR at start-up")
+    args = parser.parse_args()
+
+    setup_storage()
+    setup_logging()
+    ExtractionDaemon(args.concurrency, args.queue_size).serve_forever(warm=not args.no_warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,91 @@
 import logging
+import re
 from pathlib import Path
-import pytesseract
-import fitz  # PyMuPDF
-from PIL import Image
-import whisper
 import subprocess
-import tempfile
-import os
-from docx import Document
-import pdfplumber
-from pdf2image import convert_from_path
 import zipfile
-from lxml import etree
+from logic.cache import get_extraction_cache, hash_file, make_key
+from logic.ocr import OCR_CONFIG, OCR_LANG, OCR_PREPROCESS, resolve_ocr_backend
+
+# Heavy backends (whisper/torch, PyMuPDF, pdfplumber, Tesseract, lxml, PIL) are
+# imported inside the extractors that need them, so importing this module (and
+# starting the UI) stays cheap until a file of that format is actually extracted.
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever extractor output can change for the same input bytes, so that
+# cached results from older extractors are not reused.
+EXTRACTOR_VERSION = "10"
+
+WHISPER_MODEL = "base"
+
+class Segment:
+    """
+    A piece of extracted text and where it came from.
+
+    `kind` is one of "page" (PDF), "paragraph", "table_cell", "header", "footer"
+    (DOCX, in document order), "audio_chunk" (audio/video, with `start`/`end` in seconds), "image",
+    "text" or "cached" (a whole document served from the extraction cache).
+    An "audio_chunk" also carries Whisper's timestamped segments within it in
+    `timestamps`, for `logic.transcript.store_transcript`.
+    """
+
+    def __init__(self, kind: str, text: str, index: int, page: int = None, start: float = None, end: float = None,
+                 timestamps: list = None):
+        self.kind = kind
+        self.text = text
+        self.index = index
+        self.page = page
+        self.start = start
+        self.end = end
+        self.timestamps = timestamps
+
+    def __repr__(self):
+        return f"Segment(kind={self.kind!r}, index={self.index}, chars={len(self.text)})"
+
+
+def join_segments(segments) -> str:
+    """Join segment text the way the whole-file extractors do."""
+    segments = [segment for segment in segments if segment.text]
+    separator = " " if segments and all(s.kind == "audio_chunk" for s in segments) else "\n"
+    return separator.join(segment.text for segment in segments)
+
+
+class _Extractor:
+    def __init__(self, extract, iterate=None, options=None):
+        self.extract = extract
+        self.iterate = iterate
+        self.options = options
+
+
+_EXTRACTORS = {}
+
+
+def register_extractor(extensions, extract, iterate=None, options=None):
+    """
+    Register the extractor used for files with the given extensions.
+
+    Args:
+        extensions: Extensions (with the leading dot) handled by this extractor.
+        extract: `extract(file_path) -> str`.
+        iterate: Optional `iterate(file_path)` generator of `Segment`s; defaults
+            to a single segment holding `extract`'s result.
+        options: Optional `options() -> dict` of settings that change the
+            extractor's output; they become part of the extraction cache key.
+    """
+    for extension in extensions:
+        _EXTRACTORS[extension.lower()] = _Extractor(extract, iterate, options)
+
+
+def supported_extensions() -> list:
+    return sorted(_EXTRACTORS)
+
+
+def _get_extractor(extension: str) -> _Extractor:
+    extractor = _EXTRACTORS.get(extension)
+    if extractor is None:
+        raise ValueError(f"Unsupported file type: {extension}")
+    return extractor
+
 
 def extract_text_from_file(file_path: Path) -> str:
     """
@@ -35,32 +106,159 @@ def extract_text_from_file(file_path: Path) -> str:
     logger.info(f"Attempting to extract text from {file_path} (type: {extension})")
 
     try:
-        if extension in [".png", ".jpg", ".jpeg"]:
-            return extract_text_from_image(file_path)
-        elif extension == ".pdf":
-            return extract_text_from_pdf(file_path)
-        elif extension in [".mp3", ".wav"]:
-            return extract_text_from_audio(file_path)
-        elif extension == ".mp4":
-            return extract_text_from_video(file_path)
-        elif extension == ".txt":
-            return extract_text_from_text(file_path)
-        elif extension == ".docx":
-            return extract_text_from_docx(file_path)
+        return _get_extractor(extension).extract(file_path)
+    except Exception as e:
+        logger.error(f"Error extracting text from {file_path}: {str(e)}", exc_info=True)
+        raise
+
+
+def extraction_cache_key(file_path: Path, file_hash: str = None) -> str:
+    """
+    Cache key for a file: its content hash plus everything that affects extractor output.
+
+    Pass `file_hash` (from `hash_file`) when it is already known, to skip reading the file again.
+    """
+    extension = file_path.suffix.lower()
+    extractor = _get_extractor(extension)
+    options = extractor.options() if extractor.options else {}
+    return make_key(file_hash or hash_file(file_path), extension, EXTRACTOR_VERSION, options)
+
+
+def extract_text_from_file_cached(file_path: Path) -> str:
+    """
+    Extract text like `extract_text_from_file`, reusing earlier results for identical bytes.
+
+    Results are keyed on the SHA-256 of the file contents, the extractor version
+    and the extractor's options, so a repeat upload of the same file skips
+    extraction entirely.
+    """
+    file_path = Path(file_path)
+    cache = get_extraction_cache()
+    key = extraction_cache_key(file_path)
+
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"Extraction cache hit for {file_path.name} ({key[:12]})")
+        return cached.decode("utf-8")
+
+    from logic.transcript import TRANSCRIBED_EXTENSIONS
+
+    if file_path.suffix.lower() in TRANSCRIBED_EXTENSIONS:
+        # Streamed, so the timestamped transcript is stored under the key computed above.
+        return join_segments(_extract_and_store(file_path, key))
+    text = extract_text_from_file(file_path)
+    cache.set(key, text.encode("utf-8"), source=file_path.name)
+    return text
+
+
+def iter_extract(file_path: Path):
+    """
+    Extract text incrementally, yielding `Segment`s as soon as each one is ready.
+
+    PDFs yield pages, DOCX files yield paragraphs, table cells, headers and
+    footers, and audio/video yield timestamped transcript chunks. Joining the
+    segments with `join_segments` gives the same text as `extract_text_from_file`.
+
+    Raises:
+        Exception: If extraction fails or file type is unsupported.
+    """
+    file_path = Path(file_path)
+    extension = file_path.suffix.lower()
+
+    logger.info(f"Streaming text extraction from {file_path} (type: {extension})")
+
+    try:
+        extractor = _get_extractor(extension)
+        if extractor.iterate is not None:
+            yield from extractor.iterate(file_path)
         else:
-            raise ValueError(f"Unsupported file type: {extension}")
+            yield Segment(extension.lstrip("."), extractor.extract(file_path), 0)
     except Exception as e:
         logger.error(f"Error extracting text from {file_path}: {str(e)}", exc_info=True)
         raise
 
 
+def iter_extract_cached(file_path: Path):
+    """
+    Like `iter_extract`, but serve repeat uploads of identical bytes from the extraction cache.
+
+    A cache hit yields a single "cached" segment holding the whole text; a miss
+    streams segments as usual and stores the joined text once extraction finishes.
+    """
+    file_path = Path(file_path)
+    cache = get_extraction_cache()
+    key = extraction_cache_key(file_path)
+
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"Extraction cache hit for {file_path.name} ({key[:12]})")
+        yield Segment("cached", cached.decode("utf-8"), 0)
+        return
+    yield from _extract_and_store(file_path, key)
+
+
+def _extract_and_store(file_path: Path, key: str):
+    """`iter_extract`, then cache the joined text (and a recording's transcript) under `key` once it finishes."""
+    from logic.transcript import store_transcript
+
+    segments = []
+    for segment in iter_extract(file_path):
+        segments.append(segment)
+        yield segment
+    get_extraction_cache().set(key, join_segments(segments).encode("utf-8"), source=file_path.name)
+    store_transcript(file_path, segments, key)
+
+
+def _ocr_options() -> dict:
+    return {
+        "ocr_lang": OCR_LANG, "ocr_config": OCR_CONFIG, "ocr_preprocess": OCR_PREPROCESS,
+        # tesserocr and the tesseract CLI can read the same image differently; keep their results apart.
+        "ocr_backend": resolve_ocr_backend(),
+    }
+
+
+def _transcription_options() -> dict:
+    from logic.transcription import VAD_ENABLED
+
+    return {"whisper_model": WHISPER_MODEL, "vad": VAD_ENABLED}
+
+
+def _iter_image_segments(file_path: Path):
+    yield Segment("image", extract_text_from_image(file_path), 0)
+
+
+def _iter_pdf_segments(file_path: Path):
+    from logic.pdf import iter_pdf_pages
+
+    for page in iter_pdf_pages(file_path):
+        yield Segment("page", page.text, page.page_number, page=page.page_number + 1)
+
+
+def _iter_audio_segments(file_path: Path):
+    from logic.transcription import iter_transcribe_file
+
+    for chunk in iter_transcribe_file(file_path, WHISPER_MODEL):
+        yield Segment(
+            "audio_chunk", chunk.text, chunk.index, start=chunk.start, end=chunk.end, timestamps=chunk.segments,
+        )
+
+
+def _iter_text_segments(file_path: Path):
+    from logic.textfile import iter_text_pieces
+
+    for index, piece in enumerate(iter_text_pieces(file_path)):
+        yield Segment("text", piece, index)
+
+
 def extract_text_from_image(file_path: Path) -> str:
     """Extract text from an image using Tesseract OCR."""
+    from PIL import Image
+    from logic.ocr import ocr_image
+
     try:
         logger.info(f"Extracting text from image: {file_path}")
         image = Image.open(file_path)
-        text = pytesseract.image_to_string(image, lang='eng', config='--psm 6')
-        result = text.strip()
+        result = ocr_image(image)
         logger.info(f"Successfully extracted {len(result)} characters from image")
         return result
     except Exception as e:
@@ -69,81 +267,37 @@ def extract_text_from_image(file_path: Path) -> str:
 
 
 def extract_text_from_pdf(file_path: Path) -> str:
-    """Extract text from a PDF using multiple methods with fallbacks."""
+    """Extract text from a PDF page by page, in parallel, OCRing only the pages that need it."""
+    from logic.pdf import extract_pdf_pages, page_report
+
     try:
         logger.info(f"Extracting text from PDF: {file_path}")
-        
-        # Method 1: Try pdfplumber first (better for text-based PDFs)
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                text_parts = []
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text and page_text.strip():
-                        text_parts.append(page_text.strip())
-                
-                if text_parts:
-                    result = "\n".join(text_parts)
-                    logger.info(f"Successfully extracted {len(result)} characters using pdfplumber")
-                    return result
-        except Exception as e:
-            logger.warning(f"pdfplumber failed: {str(e)}, trying PyMuPDF...")
-
-        # Method 2: Try PyMuPDF
-        try:
-            doc = fitz.open(file_path)
-            text_parts = []
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                page_text = page.get_text().strip()
-                if page_text:
-                    text_parts.append(page_text)
-                else:
-                    # Try OCR for image-based pages
-                    pix = page.get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.rgb)
-                    page_text = pytesseract.image_to_string(img, lang='eng', config='--psm 6')
-                    if page_text.strip():
-                        text_parts.append(page_text.strip())
-            doc.close()
-            
-            if text_parts:
-                result = "\n".join(text_parts)
-                logger.info(f"Successfully extracted {len(result)} characters using PyMuPDF")
-                return result
-        except Exception as e:
-            logger.warning(f"PyMuPDF failed: {str(e)}, trying OCR...")
-
-        # Method 3: OCR fallback
-        try:
-            images = convert_from_path(file_path, dpi=300)
-            text_parts = []
-            for image in images:
-                text = pytesseract.image_to_string(image, lang='eng', config='--psm 6')
-                if text.strip():
-                    text_parts.append(text.strip())
-            
-            if text_parts:
-                result = "\n".join(text_parts)
-                logger.info(f"Successfully extracted {len(result)} characters using OCR")
-                return result
-        except Exception as e:
-            logger.error(f"OCR fallback failed: {str(e)}")
-
-        raise Exception("All PDF extraction methods failed. The PDF might be encrypted, corrupted, or contain no extractable text.")
-        
+
+        pages = extract_pdf_pages(file_path)
+        text_parts = [page.text for page in pages if page.text]
+        if not text_parts:
+            raise Exception("All PDF extraction methods failed. The PDF might be encrypted, corrupted, or contain no extractable text.")
+
+        report = page_report(pages)
+        for page in report["pages"]:
+            logger.debug(f"PDF page {page['page']}: {page['kind']} via {page['method']} in {page['seconds']:.3f}s")
+        result = "\n".join(text_parts)
+        logger.info(f"Successfully extracted {len(result)} characters from {len(pages)} pages (methods: {report['methods']})")
+        return result
+
     except Exception as e:
         logger.error(f"PDF extraction failed for {file_path}: {str(e)}")
         raise Exception(f"PDF extraction failed: {str(e)}")
 
 
 def extract_text_from_audio(file_path: Path) -> str:
-    """Transcribe audio to text using Whisper."""
+    """Transcribe audio to text using Whisper, spreading long files across worker processes."""
+    from logic.transcription import transcribe_file
+
     try:
         logger.info(f"Transcribing audio: {file_path}")
-        model = whisper.load_model("base")
-        result = model.transcribe(str(file_path))
-        text = result["text"].strip()
+        result = transcribe_file(file_path, WHISPER_MODEL)
+        text = result.text
         logger.info(f"Successfully transcribed {len(text)} characters from audio")
         return text
     except Exception as e:
@@ -152,63 +306,18 @@ def extract_text_from_audio(file_path: Path) -> str:
 
 
 def extract_text_from_video(file_path: Path) -> str:
-    """Extract audio from video in chunks and transcribe to text."""
+    """Decode the video's audio track in a single ffmpeg pass and transcribe its chunks in parallel."""
+    from logic.transcription import transcribe_file
+
     try:
-        logger.info(f"Extracting audio from video: {file_path}")
-        
-        # Get video duration using ffprobe
-        result = subprocess.run(
-            [
-                "ffprobe", "-v", "error", "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1", str(file_path)
-            ],
-            capture_output=True, text=True, check=True
-        )
-        duration = float(result.stdout)
-        
-        logger.info(f"Video duration: {duration:.2f} seconds. Processing in 60-second chunks.")
-        
-        model = whisper.load_model("base")
-        full_text = []
-        
-        # Process in 60-second chunks
-        for start_time in range(0, int(duration), 60):
-            chunk_duration = min(60, duration - start_time)
-            logger.info(f"Processing chunk: {start_time}s - {start_time + chunk_duration}s")
-            
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-                temp_audio_path = temp_audio.name
-            
-            try:
-                # Extract audio chunk using FFmpeg
-                subprocess.run(
-                    [
-                        "ffmpeg", "-i", str(file_path), "-ss", str(start_time),
-                        "-t", str(chunk_duration), "-vn", "-acodec", "pcm_s16le",
-                        "-ar", "16000", "-ac", "1", temp_audio_path
-                    ],
-                    check=True, capture_output=True, text=True
-                )
-                
-                # Transcribe the chunk
-                transcription_result = model.transcribe(temp_audio_path)
-                chunk_text = transcription_result["text"].strip()
-                if chunk_text:
-                    full_text.append(chunk_text)
-            
-            finally:
-                # Clean up the temporary file
-                try:
-                    os.remove(temp_audio_path)
-                except OSError:
-                    pass
-        
-        final_text = " ".join(full_text)
+        logger.info(f"Streaming audio from video: {file_path}")
+        result = transcribe_file(file_path, WHISPER_MODEL)
+        final_text = result.text
         logger.info(f"Successfully transcribed {len(final_text)} characters from video.")
         return final_text
 
     except subprocess.CalledProcessError as e:
-        logger.error(f"FFmpeg or ffprobe failed: {e.stderr}")
+        logger.error(f"FFmpeg failed: {e.stderr}")
         raise Exception("Video processing failed. Ensure FFmpeg is installed and accessible.")
     except Exception as e:
         logger.error(f"Video transcription failed for {file_path}: {str(e)}")
@@ -216,71 +325,133 @@ def extract_text_from_video(file_path: Path) -> str:
 
 
 def extract_text_from_text(file_path: Path) -> str:
-    """Read text from a plain text file."""
+    """Read text from a plain text file in a single memory-mapped pass (see `logic.textfile`)."""
+    from logic.textfile import iter_text_pieces
+
     try:
         logger.info(f"Reading text file: {file_path}")
-        with open(file_path, "r", encoding="utf-8") as f:
-            text = f.read().strip()
+        text = "\n".join(iter_text_pieces(file_path))
         logger.info(f"Successfully read {len(text)} characters from text file")
         return text
-    except UnicodeDecodeError:
-        # Try with different encoding
-        try:
-            with open(file_path, "r", encoding="latin-1") as f:
-                text = f.read().strip()
-            logger.info(f"Successfully read {len(text)} characters using latin-1 encoding")
-            return text
-        except Exception as e:
-            logger.error(f"Text file reading failed with latin-1 encoding: {str(e)}")
-            raise Exception(f"Text file reading failed: Unable to decode file with UTF-8 or latin-1 encoding.")
     except Exception as e:
         logger.error(f"Text file reading failed for {file_path}: {str(e)}")
         raise Exception(f"Text file reading failed: {str(e)}")
 
 
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_W = f"{{{_W_NS}}}"
+_DOCX_HEADER_FOOTER = re.compile(r"^word/(header|footer)(\d*)\.xml$")
+
+
+def _docx_part_order(name: str):
+    """Sort key putting every header before every footer, each in part-number order."""
+    match = _DOCX_HEADER_FOOTER.match(name)
+    return (0 if match.group(1) == "header" else 1), int(match.group(2) or 0)
+
+
+def _drop_processed(elem):
+    """Free a fully handled element and everything before it so memory stays flat."""
+    elem.clear(keep_tail=True)
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def _iter_docx_part(stream, paragraph_kind: str):
+    """
+    Stream one WordprocessingML part, yielding `(kind, text)` in document order.
+
+    Body paragraphs are yielded as `paragraph_kind`; each table cell is yielded
+    once as "table_cell". Vertically merged continuation cells are skipped, and
+    horizontally merged cells are a single `w:tc` in the XML, so merged cells
+    are never repeated the way `row.cells` repeats them.
+    """
+    from lxml import etree
+
+    paragraphs = []  # text buffers of the open (possibly nested) paragraphs
+    cells = []  # [paragraph texts, is_merge_continuation] of the open cells
+    for event, elem in etree.iterparse(
+        stream, events=("start", "end"), resolve_entities=False, load_dtd=False, no_network=True, huge_tree=True
+    ):
+        tag = elem.tag
+        if event == "start":
+            if tag == f"{_W}p":
+                paragraphs.append([])
+            elif tag == f"{_W}tc":
+                cells.append([[], False])
+            continue
+
+        if tag == f"{_W}t":
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == f"{_W}tab":
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in (f"{_W}br", f"{_W}cr"):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == f"{_W}vMerge":
+            if cells and elem.get(f"{_W}val", "continue") == "continue":
+                cells[-1][1] = True
+        elif tag == f"{_W}p":
+            text = "".join(paragraphs.pop()).strip()
+            if cells:
+                cells[-1][0].append(text)
+            elif text:
+                yield paragraph_kind, text
+            _drop_processed(elem)
+        elif tag == f"{_W}tc":
+            parts, is_continuation = cells.pop()
+            text = "\n".join(parts).strip()
+            if text and not is_continuation:
+                yield "table_cell", text
+            _drop_processed(elem)
+        elif tag in (f"{_W}tr", f"{_W}tbl"):
+            _drop_processed(elem)
+
+
+def iter_docx_segments(file_path: Path):
+    """
+    Yield the text of a Word document in document order, then its headers and footers.
+
+    `word/document.xml` and the header/footer parts are streamed straight out
+    of the ZIP with `iterparse`, so the file is opened once and memory stays
+    flat regardless of document size.
+    """
+    # Validate if it's a valid DOCX (ZIP archive)
+    try:
+        z = zipfile.ZipFile(file_path)
+    except zipfile.BadZipFile:
+        logger.warning(f"File {file_path} is not a valid ZIP archive, trying raw XML extraction...")
+        yield Segment("paragraph", extract_text_from_raw_xml(file_path), 0)
+        return
+
+    with z:
+        names = z.namelist()
+        if 'word/document.xml' not in names:
+            raise ValueError("Invalid DOCX file: missing document.xml")
+
+        parts = [("word/document.xml", "paragraph")]
+        for name in sorted((n for n in names if _DOCX_HEADER_FOOTER.match(n)), key=_docx_part_order):
+            parts.append((name, _DOCX_HEADER_FOOTER.match(name).group(1)))
+
+        index = 0
+        for name, paragraph_kind in parts:
+            with z.open(name) as stream:
+                for kind, text in _iter_docx_part(stream, paragraph_kind):
+                    yield Segment(kind, text, index)
+                    index += 1
+
+
 def extract_text_from_docx(file_path: Path) -> str:
     """Extract text from a Word document with enhanced error handling."""
     try:
         logger.info(f"Extracting text from DOCX: {file_path}")
-        
-        # Validate if it's a valid DOCX (ZIP archive)
-        try:
-            with zipfile.ZipFile(file_path) as z:
-                if 'word/document.xml' not in z.namelist():
-                    raise ValueError("Invalid DOCX file: missing document.xml")
-        except zipfile.BadZipFile:
-            logger.warning(f"File {file_path} is not a valid ZIP archive, trying raw XML extraction...")
-            return extract_text_from_raw_xml(file_path)
-        
-        # Standard DOCX extraction
-        doc = Document(file_path)
-        text_parts = []
-        
-        # Extract paragraphs
-        for para in doc.paragraphs:
-            if para.text.strip():
-                text_parts.append(para.text.strip())
-        
-        # Extract from tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if cell.text.strip():
-                        text_parts.append(cell.text.strip())
-        
-        # Extract from headers and footers
-        for section in doc.sections:
-            for header in section.header.paragraphs:
-                if header.text.strip():
-                    text_parts.append(header.text.strip())
-            for footer in section.footer.paragraphs:
-                if footer.text.strip():
-                    text_parts.append(footer.text.strip())
-        
-        result = "\n".join(text_parts)
+        result = join_segments(iter_docx_segments(file_path))
         logger.info(f"Successfully extracted {len(result)} characters from DOCX")
         return result
-        
+
     except Exception as e:
         logger.error(f"DOCX extraction failed for {file_path}: {str(e)}")
         raise Exception(f"Word document extraction failed: {str(e)}")
@@ -288,6 +459,8 @@ def extract_text_from_docx(file_path: Path) -> str:
 
 def extract_text_from_raw_xml(file_path: Path) -> str:
     """Extract text from raw Word document.xml with external entity resolution disabled."""
+    from lxml import etree
+
     try:
         logger.info(f"Extracting text from raw XML: {file_path}")
         parser = etree.XMLParser(resolve_entities=False, load_dtd=False, no_network=True)
@@ -324,4 +497,12 @@ def extract_text_from_raw_xml(file_path: Path) -> str:
         raise Exception(f"Failed to parse XML: {str(e)}")
     except Exception as e:
         logger.error(f"Raw XML extraction failed: {str(e)}")
-        raise Exception(f"Failed to extract text from XML: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Failed to extract text from XML: {str(e)}")
+
+
+register_extractor([".png", ".jpg", ".jpeg"], extract_text_from_image, _iter_image_segments, _ocr_options)
+register_extractor([".pdf"], extract_text_from_pdf, _iter_pdf_segments, _ocr_options)
+register_extractor([".mp3", ".wav"], extract_text_from_audio, _iter_audio_segments, _transcription_options)
+register_extractor([".mp4"], extract_text_from_video, _iter_audio_segments, _transcription_options)
+register_extractor([".txt"], extract_text_from_text, _iter_text_segments)
+register_extractor([".docx"], extract_text_from_docx, iter_docx_segments)
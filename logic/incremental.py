@@ -0,0 +1,303 @@
+import difflib
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from logic.cache import get_extraction_cache, get_manifest_cache, hash_file, make_key
+from logic.extraction import (
+    EXTRACTOR_VERSION,
+    Segment,
+    _get_extractor,
+    extraction_cache_key,
+    join_segments,
+)
+from logic.limits import extract_with_limits
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = "1"
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+
+class ManifestUnit:
+    """One page/paragraph/cell of a document: its extracted segment plus a fingerprint of its source."""
+
+    def __init__(self, segment: Segment, fingerprint: str):
+        self.segment = segment
+        self.fingerprint = fingerprint
+
+    def to_dict(self) -> dict:
+        segment = self.segment
+        return {
+            "kind": segment.kind,
+            "index": segment.index,
+            "page": segment.page,
+            "start": segment.start,
+            "end": segment.end,
+            "text": segment.text,
+            "fingerprint": self.fingerprint,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ManifestUnit":
+        segment = Segment(data["kind"], data["text"], data["index"], data["page"], data["start"], data["end"])
+        return cls(segment, data["fingerprint"])
+
+
+class UnitChange:
+    """A unit that was added, removed or changed between two versions of a document."""
+
+    def __init__(self, op: str, kind: str, old_index: Optional[int], new_index: Optional[int],
+                 old_text: str = "", new_text: str = "", page: Optional[int] = None):
+        self.op = op
+        self.kind = kind
+        self.old_index = old_index
+        self.new_index = new_index
+        self.old_text = old_text
+        self.new_text = new_text
+        self.page = page
+
+    def to_dict(self) -> dict:
+        return {
+            "op": self.op,
+            "kind": self.kind,
+            "old_index": self.old_index,
+            "new_index": self.new_index,
+            "page": self.page,
+            "old_text": self.old_text,
+            "new_text": self.new_text,
+        }
+
+    def __repr__(self):
+        return f"UnitChange(op={self.op!r}, kind={self.kind!r}, old_index={self.old_index}, new_index={self.new_index})"
+
+
+class IncrementalExtraction:
+    """
+    Result of `extract_incremental`: the full text plus what changed since the previous version.
+
+    When extraction was stopped early (`complete` is False, with `stop_reason`
+    as in `ExtractionOutcome`), `units` holds only the units available by then
+    and `changes` is empty.
+    """
+
+    def __init__(self, units: List[ManifestUnit], changes: List[UnitChange], unchanged: int,
+                 reused: int, extracted: int, previous_file_hash: Optional[str],
+                 complete: bool = True, stop_reason: Optional[str] = None):
+        self.units = units
+        self.changes = changes
+        self.unchanged = unchanged
+        self.reused = reused
+        self.extracted = extracted
+        self.previous_file_hash = previous_file_hash
+        self.complete = complete
+        self.stop_reason = stop_reason
+        self.text = join_segments(unit.segment for unit in units)
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_file_hash is not None
+
+    def changed_text(self) -> str:
+        """Text of the added and changed units only, for stages that only need to see what is new."""
+        return "\n".join(change.new_text for change in self.changes if change.op != REMOVED and change.new_text)
+
+    def summary(self) -> dict:
+        counts = {ADDED: 0, REMOVED: 0, CHANGED: 0}
+        for change in self.changes:
+            counts[change.op] += 1
+        return {**counts, "unchanged": self.unchanged, "reused": self.reused, "extracted": self.extracted}
+
+    def to_dict(self) -> dict:
+        return {
+            "has_previous": self.has_previous,
+            "summary": self.summary(),
+            "changes": [change.to_dict() for change in self.changes],
+        }
+
+
+def _manifest_key(file_path: Path, document_id: Optional[str] = None) -> str:
+    # Versions of a document share its upload name, not its bytes.
+    extension = file_path.suffix.lower()
+    extractor = _get_extractor(extension)
+    options = extractor.options() if extractor.options else {}
+    return make_key("manifest", document_id or file_path.name, extension, EXTRACTOR_VERSION, options)
+
+
+def load_manifest(file_path: Path, document_id: Optional[str] = None) -> Optional[dict]:
+    file_path = Path(file_path)
+    data = get_manifest_cache().get(_manifest_key(file_path, document_id))
+    if data is None:
+        return None
+    try:
+        manifest = json.loads(data.decode("utf-8"))
+    except ValueError:
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    manifest["units"] = [ManifestUnit.from_dict(unit) for unit in manifest["units"]]
+    return manifest
+
+
+def has_manifest(file_path: Path, document_id: Optional[str] = None) -> bool:
+    """Whether an earlier version of this document has been extracted with a manifest."""
+    return load_manifest(file_path, document_id) is not None
+
+
+def _save_manifest(file_path: Path, file_hash: str, units: List[ManifestUnit], document_id: Optional[str]):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "file_hash": file_hash,
+        "units": [unit.to_dict() for unit in units],
+    }
+    get_manifest_cache().set(
+        _manifest_key(file_path, document_id), json.dumps(manifest).encode("utf-8"), source=file_path.name,
+    )
+
+
+def _text_fingerprint(segment: Segment) -> str:
+    return hashlib.sha256(f"{segment.kind}\0{segment.text}".encode("utf-8")).hexdigest()
+
+
+def _units_from_segments(file_path: Path, segments: List[Segment]) -> List[ManifestUnit]:
+    if file_path.suffix.lower() == ".pdf":
+        from logic.pdf import page_fingerprints
+
+        fingerprints = page_fingerprints(file_path)
+        if len(fingerprints) == len(segments):
+            return [ManifestUnit(segment, fp) for segment, fp in zip(segments, fingerprints)]
+    return [ManifestUnit(segment, _text_fingerprint(segment)) for segment in segments]
+
+
+def record_manifest(file_path: Path, segments: List[Segment], document_id: Optional[str] = None):
+    """
+    Store a manifest for segments that were just extracted, so the next version can be extracted incrementally.
+
+    Does nothing for a whole-document "cached" segment, which has no units to fingerprint.
+    """
+    file_path = Path(file_path)
+    if any(segment.kind == "cached" for segment in segments):
+        return
+    try:
+        _save_manifest(file_path, hash_file(file_path), _units_from_segments(file_path, segments), document_id)
+    except Exception as e:
+        logger.warning(f"Could not record extraction manifest for {file_path.name}: {str(e)}")
+
+
+def diff_units(old_units: List[ManifestUnit], new_units: List[ManifestUnit]):
+    """
+    Align two unit lists by fingerprint and describe the differences.
+
+    Returns:
+        (changes, unchanged_count)
+    """
+    matcher = difflib.SequenceMatcher(
+        None, [u.fingerprint for u in old_units], [u.fingerprint for u in new_units], autojunk=False,
+    )
+    changes = []
+    unchanged = 0
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            unchanged += i2 - i1
+            continue
+        old_slice, new_slice = old_units[i1:i2], new_units[j1:j2]
+        for k in range(max(len(old_slice), len(new_slice))):
+            old = old_slice[k].segment if k < len(old_slice) else None
+            new = new_slice[k].segment if k < len(new_slice) else None
+            if old is not None and new is not None:
+                changes.append(UnitChange(CHANGED, new.kind, old.index, new.index, old.text, new.text, new.page))
+            elif new is not None:
+                changes.append(UnitChange(ADDED, new.kind, None, new.index, "", new.text, new.page))
+            else:
+                changes.append(UnitChange(REMOVED, old.kind, old.index, None, old.text, "", old.page))
+    return changes, unchanged
+
+
+def _extract_pdf_units(file_path: Path, previous_units: List[ManifestUnit], limits: dict):
+    """
+    Re-extract (and re-OCR) only the pages whose fingerprint is new, within the extraction budget.
+
+    Returns:
+        (units, reused, extracted, outcome); `outcome` is None when no page needed extracting.
+    """
+    from logic.pdf import page_fingerprints
+
+    fingerprints = page_fingerprints(file_path)
+    known = {unit.fingerprint: unit.segment.text for unit in previous_units if unit.segment.kind == "page"}
+    todo = [number for number, fp in enumerate(fingerprints) if fp not in known]
+    outcome = extract_with_limits(file_path, pages=todo, **limits) if todo else None
+    extracted = {segment.index: segment.text for segment in outcome.segments} if outcome else {}
+
+    units = []
+    for number, fp in enumerate(fingerprints):
+        if number in extracted or fp in known:
+            text = extracted[number] if number in extracted else known[fp]
+            units.append(ManifestUnit(Segment("page", text, number, page=number + 1), fp))
+    return units, sum(fp in known for fp in fingerprints), len(extracted), outcome
+
+
+def extract_incremental(
+    file_path: Path,
+    document_id: Optional[str] = None,
+    cancel: Optional[threading.Event] = None,
+    on_segment: Optional[Callable[[Segment], None]] = None,
+) -> IncrementalExtraction:
+    """
+    Extract a document, reusing the units that are unchanged since its previous version.
+
+    Versions are matched by `document_id` (the upload name by default). PDF
+    pages are fingerprinted from their content streams and images, so only new
+    or edited pages are extracted or OCRed; other formats are re-extracted
+    and compared unit by unit. Either way the extraction runs through
+    `extract_with_limits`, under the same sandbox, budgets and cancellation
+    as a first upload. The new manifest replaces the old one and the joined
+    text is stored in the extraction cache, unless extraction stopped early.
+
+    Raises:
+        Exception: If extraction fails or file type is unsupported.
+    """
+    file_path = Path(file_path)
+    previous = load_manifest(file_path, document_id)
+    previous_units = previous["units"] if previous else []
+    file_hash = hash_file(file_path)
+    # The manifest decides what is reused; the cache is written below from the assembled units.
+    limits = {"cancel": cancel, "on_segment": on_segment, "use_cache": False}
+
+    outcome = None
+    if previous and previous["file_hash"] == file_hash:
+        units, reused, extracted = previous_units, len(previous_units), 0
+    elif file_path.suffix.lower() == ".pdf":
+        units, reused, extracted, outcome = _extract_pdf_units(file_path, previous_units, limits)
+    else:
+        outcome = extract_with_limits(file_path, **limits)
+        units = _units_from_segments(file_path, outcome.segments)
+        reused, extracted = 0, len(units)
+
+    previous_hash = previous["file_hash"] if previous else None
+    if outcome is not None and not outcome.complete:
+        logger.warning(
+            f"Incremental extraction of {file_path.name} stopped early ({outcome.stop_reason}); "
+            "keeping the previous manifest"
+        )
+        return IncrementalExtraction(units, [], 0, reused, extracted, previous_hash, False, outcome.stop_reason)
+
+    changes, unchanged = diff_units(previous_units, units) if previous else ([], len(units))
+    result = IncrementalExtraction(units, changes, unchanged, reused, extracted, previous_hash)
+    _save_manifest(file_path, file_hash, units, document_id)
+    key = extraction_cache_key(file_path, file_hash)
+    get_extraction_cache().set(key, result.text.encode("utf-8"), source=file_path.name)
+    if outcome is not None:
+        from logic.transcript import store_transcript
+
+        store_transcript(file_path, outcome.segments, key)
+    logger.info(
+        f"Incremental extraction of {file_path.name}: {extracted} unit(s) extracted, {reused} reused, "
+        f"{len(changes)} change(s)"
+    )
+    return result
@@ -0,0 +1,182 @@
+import argparse
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional
+
+from logic.util import get_project_root
+
+logger = logging.getLogger(__name__)
+
+# Formats that extract in milliseconds and can run many at a time.
+CHEAP_EXTENSIONS = {".txt", ".docx"}
+
+
+def _pdf_has_text_layer(file_path: Path, probe_pages: int = 3) -> bool:
+    """Cheap probe: does the start of the PDF have a native text layer?"""
+    try:
+        import fitz  # PyMuPDF
+
+        with fitz.open(str(file_path)) as doc:
+            return any(doc.load_page(i).get_text().strip() for i in range(min(probe_pages, doc.page_count)))
+    except Exception:
+        return False
+
+
+def is_cheap(file_path: Path) -> bool:
+    """Whether a file goes to the cheap pool (text, DOCX, text-layer PDFs) rather than the expensive one."""
+    extension = file_path.suffix.lower()
+    if extension in CHEAP_EXTENSIONS:
+        return True
+    if extension == ".pdf":
+        return _pdf_has_text_layer(file_path)
+    return False
+
+
+def find_files(directory: Path, extensions) -> List[Path]:
+    return sorted(
+        path for path in Path(directory).rglob("*")
+        if path.is_file() and path.suffix.lower() in extensions
+    )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class IngestResult:
+    def __init__(self, path: Path, pool: str, seconds: float, size: int, chars: int = 0, error: Optional[str] = None):
+        self.path = path
+        self.pool = pool
+        self.seconds = seconds
+        self.size = size
+        self.chars = chars
+        self.error = error
+
+
+def _extract_one(file_path: Path, output_dir: Path, pool: str, use_cache: bool) -> IngestResult:
+    from logic.extraction import extract_text_from_file, extract_text_from_file_cached
+    from logic.transcript import save_transcript_beside
+
+    size = file_path.stat().st_size
+    started = time.perf_counter()
+    try:
+        extract = extract_text_from_file_cached if use_cache else extract_text_from_file
+        text = extract(file_path)
+        # Same naming as the File Analysis page: "<original name>.txt"
+        with open(output_dir / f"{file_path.name}.txt", "w", encoding="utf-8") as f:
+            f.write(text)
+        save_transcript_beside(file_path, output_dir / f"{file_path.name}.txt")
+        return IngestResult(file_path, pool, time.perf_counter() - started, size, chars=len(text))
+    except Exception as e:
+        return IngestResult(file_path, pool, time.perf_counter() - started, size, error=str(e))
+
+
+def ingest_directory(
+    directory: Path,
+    output_dir: Path,
+    cheap_workers: int,
+    heavy_workers: int,
+    use_cache: bool = True,
+    on_result=None,
+) -> List[IngestResult]:
+    """
+    Extract every supported file under `directory` concurrently.
+
+    Cheap formats and expensive ones (audio/video/images/scanned PDFs) run in
+    separate pools, so a queue of recordings can't starve the quick files.
+    The expensive extractors fan out to their own process pools, so the
+    expensive pool only needs a few threads.
+    """
+    from logic.extraction import supported_extensions
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files = find_files(directory, set(supported_extensions()))
+    results = []
+    with ThreadPoolExecutor(cheap_workers, thread_name_prefix="ingest-cheap") as cheap_pool, \
+            ThreadPoolExecutor(heavy_workers, thread_name_prefix="ingest-heavy") as heavy_pool:
+        futures = []
+        for file_path in files:
+            if is_cheap(file_path):
+                futures.append(cheap_pool.submit(_extract_one, file_path, output_dir, "cheap", use_cache))
+            else:
+                futures.append(heavy_pool.submit(_extract_one, file_path, output_dir, "heavy", use_cache))
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+
+def format_summary(results: List[IngestResult], wall_seconds: float) -> str:
+    total_mb = sum(r.size for r in results) / (1024 * 1024)
+    failed = [r for r in results if r.error]
+    lines = [
+        f"Processed {len(results)} file(s) ({len(failed)} failed) in {wall_seconds:.2f}s",
+        f"Throughput: {len(results) / wall_seconds:.2f} files/s, {total_mb / wall_seconds:.2f} MB/s",
+        "",
+        f"{'format':<8}{'files':>6}{'p50 s':>10}{'p90 s':>10}{'p99 s':>10}{'max s':>10}",
+    ]
+    by_format = {}
+    for result in results:
+        by_format.setdefault(result.path.suffix.lower(), []).append(result.seconds)
+    for extension in sorted(by_format):
+        latencies = by_format[extension]
+        lines.append(
+            f"{extension:<8}{len(latencies):>6}{percentile(latencies, 50):>10.2f}"
+            f"{percentile(latencies, 90):>10.2f}{percentile(latencies, 99):>10.2f}{max(latencies):>10.2f}"
+        )
+    for result in failed:
+        lines.append(f"FAILED {result.path.name}: {result.error}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from logic.util import setup_logging, setup_storage
+
+    storage = get_project_root() / "ProjectStorage"
+    parser = argparse.ArgumentParser(description="Extract text from every supported file in a directory.")
+    parser.add_argument("directory", nargs="?", type=Path, default=storage / "uploads")
+    parser.add_argument("--output", type=Path, default=storage / "extracted")
+    parser.add_argument("--cheap-workers", type=int, default=min(32, (os.cpu_count() or 1) * 2))
+    parser.add_argument("--heavy-workers", type=int, default=2)
+    parser.add_argument("--no-cache", action="store_true", help="re-extract even if a cached result exists")
+    args = parser.parse_args(argv)
+
+    setup_storage()
+    setup_logging()
+    # Per-file progress goes to stdout; keep the console free of extractor INFO chatter.
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+            handler.setLevel(logging.WARNING)
+
+    def report(result: IngestResult):
+        status = f"ERROR: {result.error}" if result.error else f"{result.chars} chars"
+        print(f"[{result.pool:<5}] {result.seconds:7.2f}s  {result.path.name}  {status}", flush=True)
+
+    started = time.perf_counter()
+    results = ingest_directory(
+        args.directory, args.output, args.cheap_workers, args.heavy_workers,
+        use_cache=not args.no_cache, on_result=report,
+    )
+    wall_seconds = max(time.perf_counter() - started, 1e-9)
+    if not results:
+        print(f"No supported files found in {args.directory}")
+        return 0
+    print()
+    print(format_summary(results, wall_seconds))
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
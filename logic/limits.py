@@ -0,0 +1,429 @@
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from logic.cache import get_extraction_cache
+from logic.extraction import Segment, extraction_cache_key, iter_extract, join_segments
+
+logger = logging.getLogger(__name__)
+
+# Wall-clock budget per format, in seconds.
+DEFAULT_TIMEOUTS = {
+    ".txt": 60,
+    ".docx": 120,
+    ".png": 120,
+    ".jpg": 120,
+    ".jpeg": 120,
+    ".pdf": 900,
+    ".mp3": 3600,
+    ".wav": 3600,
+    ".mp4": 3600,
+}
+FALLBACK_TIMEOUT = 600
+# Resident memory budget for a sandboxed extraction, summed over the sandbox
+# and everything it started (PDF page workers, Whisper workers, ffmpeg).
+EXTRACTION_MEMORY_MB = int(os.getenv("EXTRACTION_MEMORY_MB", "4096"))
+
+# Formats whose backends can spin or balloon on a bad file run in a sandbox
+# process that can be killed; the rest are cheap and run in-process.
+SANDBOXED_EXTENSIONS = {".pdf", ".png", ".jpg", ".jpeg", ".mp3", ".wav", ".mp4"}
+MAX_IDLE_SANDBOXES = 2
+POLL_SECONDS = 0.25
+KILL_GRACE_SECONDS = 2.0
+
+STOP_TIMEOUT = "timeout"
+STOP_MEMORY = "memory"
+STOP_CANCELLED = "cancelled"
+
+
+def _parse_timeouts(value: str) -> dict:
+    """Parse EXTRACTION_TIMEOUTS, e.g. "pdf=300,mp4=7200"."""
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        extension, _, seconds = item.partition("=")
+        timeouts[f".{extension.strip().lstrip('.').lower()}"] = float(seconds)
+    return timeouts
+
+
+TIMEOUTS = {**DEFAULT_TIMEOUTS, **_parse_timeouts(os.getenv("EXTRACTION_TIMEOUTS", ""))}
+
+
+def timeout_for(file_path: Path) -> float:
+    return TIMEOUTS.get(Path(file_path).suffix.lower(), FALLBACK_TIMEOUT)
+
+
+class ExtractionOutcome:
+    """
+    Segments extracted within the budget.
+
+    `complete` is False when extraction was stopped early; `stop_reason` is then
+    "timeout", "memory" or "cancelled" and `segments` holds what was finished
+    before that (pages done, chunks transcribed, ...).
+    """
+
+    def __init__(self, segments: List[Segment], complete: bool, stop_reason: Optional[str] = None,
+                 seconds: float = 0.0, cached: bool = False):
+        self.segments = segments
+        self.complete = complete
+        self.stop_reason = stop_reason
+        self.seconds = seconds
+        self.cached = cached
+
+    @property
+    def text(self) -> str:
+        return join_segments(self.segments)
+
+    def __repr__(self):
+        return (
+            f"ExtractionOutcome(segments={len(self.segments)}, complete={self.complete}, "
+            f"stop_reason={self.stop_reason!r}, seconds={self.seconds:.2f})"
+        )
+
+
+def _segment_to_dict(segment: Segment) -> dict:
+    return {
+        "kind": segment.kind, "text": segment.text, "index": segment.index,
+        "page": segment.page, "start": segment.start, "end": segment.end, "timestamps": segment.timestamps,
+    }
+
+
+def _warm_backends():
+    from logic.extraction import WHISPER_MODEL
+    from logic.ocr import get_ocr_backend
+    from logic.whisper_pool import get_whisper_pool
+
+    for name, load in (("OCR", get_ocr_backend), ("Whisper", lambda: get_whisper_pool().get(WHISPER_MODEL))):
+        try:
+            load()
+            logger.info(f"{name} backend warm")
+        except Exception as e:
+            logger.warning(f"Could not warm {name} backend: {str(e)}")
+
+
+def _iter_segments(file_path: Path, pages: Optional[List[int]] = None) -> Iterator[Segment]:
+    """Every segment of a file or, with `pages`, only those (0-based) pages of a PDF."""
+    if pages is None:
+        yield from iter_extract(file_path)
+        return
+    from logic.pdf import extract_selected_pages
+
+    for page in extract_selected_pages(file_path, pages):
+        yield Segment("page", page.text, page.page_number, page=page.page_number + 1)
+
+
+def _sandbox_main(conn):
+    """Sandbox process: extract the files it is sent, streaming segments back."""
+    if hasattr(os, "setsid"):
+        # Own process group, so the whole tree (pools, ffmpeg) can be killed together.
+        os.setsid()
+    # The sandbox runs extraction alongside other threads; forking pool workers
+    # from it can copy a held lock into the child, so its pools spawn instead.
+    multiprocessing.set_start_method("spawn", force=True)
+    from logic.util import setup_logging
+
+    setup_logging()
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+        op, file_path, pages = request
+        if op == "warm":
+            _warm_backends()
+            conn.send(("done", None))
+            continue
+        try:
+            for segment in _iter_segments(Path(file_path), pages):
+                conn.send(("segment", _segment_to_dict(segment)))
+            conn.send(("done", None))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+def _warn_unmeasured_memory():
+    """Log once that EXTRACTION_MEMORY_MB can't be enforced here (it needs /proc)."""
+    global _memory_warning_logged
+    if not _memory_warning_logged and not os.path.isdir("/proc"):
+        _memory_warning_logged = True
+        logger.warning(
+            f"EXTRACTION_MEMORY_MB is not enforced on {sys.platform}: sandbox memory can only be measured "
+            "through /proc. Extraction is still stopped by its time budget and by cancellation."
+        )
+
+
+_memory_warning_logged = False
+
+
+def _process_group_rss_mb(pgid: int) -> float:
+    """Resident memory of every process in a process group (Linux only; 0 elsewhere)."""
+    if not os.path.isdir("/proc"):
+        return 0.0
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total_pages = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[2]) != pgid:  # fields after the command name: state, ppid, pgrp, ...
+                continue
+            with open(f"/proc/{entry}/statm", "r") as f:
+                total_pages += int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return total_pages * page_size / (1024 * 1024)
+
+
+class SandboxWorker:
+    """
+    A reusable extraction subprocess.
+
+    Between jobs it stays alive, so the backends it has loaded (Whisper, the
+    OCR engine, worker pools) stay warm. When a job blows its budget or is
+    cancelled, the whole process group is killed and the worker discarded.
+    """
+
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_sandbox_main, args=(child_conn,), name="extraction-sandbox")
+        self.process.start()
+        child_conn.close()
+        # False while a request is in flight; a worker abandoned mid-request can't be reused.
+        self.idle = True
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        """Kill the sandbox and everything it started."""
+        if os.name == "nt":
+            # No process groups on Windows; taskkill /T walks the tree from the sandbox down.
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(self.process.pid)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False,
+            )
+        elif hasattr(os, "killpg"):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass  # not a group leader yet
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(KILL_GRACE_SECONDS)
+        self._conn.close()
+        self.idle = False
+
+    def close(self):
+        try:
+            self._conn.send(None)
+            self.process.join(KILL_GRACE_SECONDS)
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self._conn.close()
+
+    def warm(self):
+        """Load the expensive backends in the sandbox and wait until they are ready."""
+        self.idle = False
+        self._conn.send(("warm", None, None))
+        self._conn.recv()
+        self.idle = True
+
+    def _exited(self) -> Exception:
+        self.idle = False
+        return Exception(f"Extraction process exited unexpectedly (exit code {self.process.exitcode})")
+
+    def extract(self, file_path: Path, timeout: float, memory_mb: float,
+                cancel: Optional[threading.Event], on_segment: Optional[Callable],
+                pages: Optional[List[int]] = None) -> ExtractionOutcome:
+        started = time.monotonic()
+        deadline = started + timeout
+        segments = []
+        self.idle = False
+        self._conn.send(("extract", str(file_path), pages))
+        while True:
+            stop_reason = None
+            if cancel is not None and cancel.is_set():
+                stop_reason = STOP_CANCELLED
+            elif time.monotonic() > deadline:
+                stop_reason = STOP_TIMEOUT
+            elif memory_mb and _process_group_rss_mb(self.process.pid) > memory_mb:
+                stop_reason = STOP_MEMORY
+            if stop_reason is not None:
+                logger.warning(
+                    f"Stopping extraction of {file_path.name} ({stop_reason}) after "
+                    f"{time.monotonic() - started:.1f}s with {len(segments)} segment(s) done"
+                )
+                self.kill()
+                return ExtractionOutcome(segments, False, stop_reason, time.monotonic() - started)
+
+            try:
+                if not self._conn.poll(POLL_SECONDS):
+                    if not self.process.is_alive():
+                        raise self._exited()
+                    continue
+                kind, payload = self._conn.recv()
+            except (EOFError, OSError):
+                raise self._exited()
+            if kind == "segment":
+                segment = Segment(**payload)
+                segments.append(segment)
+                if on_segment is not None:
+                    on_segment(segment)
+            elif kind == "done":
+                self.idle = True
+                return ExtractionOutcome(segments, True, None, time.monotonic() - started)
+            else:
+                self.idle = True
+                raise Exception(payload)
+
+
+_idle_sandboxes = []
+_idle_lock = threading.Lock()
+_max_idle = MAX_IDLE_SANDBOXES
+
+
+def _acquire_sandbox() -> SandboxWorker:
+    with _idle_lock:
+        while _idle_sandboxes:
+            worker = _idle_sandboxes.pop()
+            if worker.is_alive():
+                return worker
+    return SandboxWorker()
+
+
+def _release_sandbox(worker: SandboxWorker):
+    if not worker.idle or not worker.is_alive():
+        if worker.is_alive():
+            worker.kill()
+        return
+    with _idle_lock:
+        if len(_idle_sandboxes) < _max_idle:
+            _idle_sandboxes.append(worker)
+            return
+    worker.close()
+
+
+def warm_sandboxes(count: int):
+    """Start `count` sandboxes with their backends loaded, ready for the first jobs."""
+    global _max_idle
+    with _idle_lock:
+        _max_idle = max(_max_idle, count)
+    for _ in range(count):
+        worker = SandboxWorker()
+        try:
+            worker.warm()
+        except (EOFError, OSError):
+            worker.kill()
+            continue
+        _release_sandbox(worker)
+
+
+def _close_idle_sandboxes():
+    with _idle_lock:
+        workers = list(_idle_sandboxes)
+        _idle_sandboxes.clear()
+    for worker in workers:
+        worker.close()
+
+
+# A plain atexit hook can run after multiprocessing has started joining its
+# children, which would wait forever on the idle sandboxes; a finalizer runs first.
+multiprocessing.util.Finalize(None, _close_idle_sandboxes, exitpriority=10)
+
+
+def _extract_in_process(file_path: Path, timeout: float, cancel: Optional[threading.Event],
+                        on_segment: Optional[Callable], pages: Optional[List[int]] = None) -> ExtractionOutcome:
+    """Cheap formats: check the budget and cancellation between segments."""
+    started = time.monotonic()
+    segments = []
+    for segment in _iter_segments(file_path, pages):
+        segments.append(segment)
+        if on_segment is not None:
+            on_segment(segment)
+        stop_reason = None
+        if cancel is not None and cancel.is_set():
+            stop_reason = STOP_CANCELLED
+        elif time.monotonic() - started > timeout:
+            stop_reason = STOP_TIMEOUT
+        if stop_reason is not None:
+            logger.warning(f"Stopping extraction of {file_path.name} ({stop_reason}) with {len(segments)} segment(s) done")
+            return ExtractionOutcome(segments, False, stop_reason, time.monotonic() - started)
+    return ExtractionOutcome(segments, True, None, time.monotonic() - started)
+
+
+def extract_with_limits(
+    file_path: Path,
+    timeout: Optional[float] = None,
+    memory_mb: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+    on_segment: Optional[Callable[[Segment], None]] = None,
+    use_cache: bool = True,
+    pages: Optional[List[int]] = None,
+) -> ExtractionOutcome:
+    """
+    Extract a file within a time and memory budget, returning whatever finished in time.
+
+    Heavy formats run in a sandbox subprocess that is killed (with every
+    process it started) when the budget runs out or `cancel` is set; cheap
+    formats run in-process and stop between segments. Complete results go
+    into the extraction cache, partial ones never do.
+
+    Args:
+        file_path: File to extract.
+        timeout: Seconds allowed; defaults to the per-format budget (`EXTRACTION_TIMEOUTS`).
+        memory_mb: Resident memory allowed for the sandbox tree; defaults to `EXTRACTION_MEMORY_MB`.
+        cancel: Set this event to stop extraction early.
+        on_segment: Called with each segment as it arrives.
+        use_cache: Serve and store results through the extraction cache.
+        pages: Extract only these (0-based) pages of a PDF, e.g. the ones that changed
+            since its previous version; such partial results are never cached.
+
+    Raises:
+        Exception: If the extractor fails or the file type is unsupported.
+    """
+    file_path = Path(file_path)
+    timeout = timeout or timeout_for(file_path)
+    memory_mb = EXTRACTION_MEMORY_MB if memory_mb is None else memory_mb
+
+    key = extraction_cache_key(file_path) if use_cache and pages is None else None
+    if key is not None:
+        cached = get_extraction_cache().get(key)
+        if cached is not None:
+            logger.info(f"Extraction cache hit for {file_path.name} ({key[:12]})")
+            segment = Segment("cached", cached.decode("utf-8"), 0)
+            if on_segment is not None:
+                on_segment(segment)
+            return ExtractionOutcome([segment], True, cached=True)
+
+    if file_path.suffix.lower() in SANDBOXED_EXTENSIONS:
+        if memory_mb:
+            _warn_unmeasured_memory()
+        worker = _acquire_sandbox()
+        try:
+            outcome = worker.extract(file_path, timeout, memory_mb, cancel, on_segment, pages)
+        finally:
+            _release_sandbox(worker)
+    else:
+        outcome = _extract_in_process(file_path, timeout, cancel, on_segment, pages)
+
+    if outcome.complete and key is not None:
+        from logic.transcript import store_transcript
+
+        get_extraction_cache().set(key, outcome.text.encode("utf-8"), source=file_path.name)
+        store_transcript(file_path, outcome.segments, key)
+    return outcome
@@ -1,28 +1,229 @@
+import concurrent.futures
 import logging
 import os
 import re
-from typing import List
-from groq import Groq
-from logic.util import get_project_root
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from logic.cache import get_llm_cache, make_key
+from logic.llm_client import get_client_manager
 
 logger = logging.getLogger(__name__)
 
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1").lower() in ("1", "true", "yes")
+# Sampled (temperature > 0) completions are not cached unless this is set: serving
+# the same sample again would hide that each call can give a different answer.
+LLM_CACHE_ALL_TEMPERATURES = os.getenv("LLM_CACHE_ALL_TEMPERATURES", "0").lower() in ("1", "true", "yes")
+# Shared time budget for generating the summary and the test cases together.
+ANALYSIS_TIMEOUT_SECONDS = float(os.getenv("LLM_ANALYSIS_TIMEOUT_SECONDS", "120"))
+
 
 def get_groq_client():
-    """Initialize Groq client with API key from environment or secrets."""
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        secrets_path = get_project_root() / ".streamlit" / "secrets.toml"
-        if secrets_path.exists():
-            with open(secrets_path, "r") as f:
-                import toml
-                secrets = toml.load(f)
-                api_key = secrets.get("GROQ_API_KEY")
-    if api_key:
-        return Groq(api_key=api_key)
+    """
+    Return the shared Groq client (API key from environment or secrets), or None without a key.
+
+    The client and its keep-alive connections are reused across calls; see `logic.llm_client`.
+    """
+    return get_client_manager().get()
+
+
+def llm_cache_key(model: str, system_prompt: str, user_prompt: str, max_tokens: int, temperature: float) -> str:
+    return make_key("llm", model, system_prompt, user_prompt, max_tokens, temperature)
+
+
+def _cache_key(model: str, system_prompt: str, user_prompt: str, max_tokens: int, temperature: float,
+               cache: Optional[bool] = None):
+    """
+    The response cache key for a request, or None when the request shouldn't be cached.
+
+    `cache` overrides the temperature rule: True always caches, False never does.
+    """
+    if not LLM_CACHE_ENABLED or cache is False:
+        return None
+    if cache or temperature == 0 or LLM_CACHE_ALL_TEMPERATURES:
+        return llm_cache_key(model, system_prompt, user_prompt, max_tokens, temperature)
     return None
 
 
+def _cached_response(key, model: str):
+    if key is None:
+        return None
+    cached = get_llm_cache().get(key)
+    if cached is None:
+        return None
+    logger.info(f"LLM cache hit for {model} ({key[:12]})")
+    return cached.decode("utf-8")
+
+
+def _messages(system_prompt: str, user_prompt: str) -> list:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _complete(client, model: str, system_prompt: str, user_prompt: str, max_tokens: int, temperature: float) -> str:
+    """Run one chat completion, serving repeats of a cacheable request from the LLM response cache."""
+    key = _cache_key(model, system_prompt, user_prompt, max_tokens, temperature)
+    cached = _cached_response(key, model)
+    if cached is not None:
+        return cached
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=_messages(system_prompt, user_prompt),
+        max_tokens=max_tokens,
+        temperature=temperature,
+    )
+    content = response.choices[0].message.content.strip()
+    if key is not None:
+        get_llm_cache().set(key, content.encode("utf-8"), model=model)
+    return content
+
+
+class _NoLimit:
+    """Async stand-in for `contextlib.nullcontext`, which only supports `async with` from Python 3.10."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+async def _acomplete(client, model: str, system_prompt: str, user_prompt: str, max_tokens: int,
+                     temperature: float, cache: Optional[bool] = None, limiter=None) -> str:
+    """
+    `_complete` for the AsyncGroq client.
+
+    Args:
+        cache: Force (True) or skip (False) the response cache instead of deciding by temperature.
+        limiter: Async context manager held around the API request (not around cache hits).
+    """
+    key = _cache_key(model, system_prompt, user_prompt, max_tokens, temperature, cache)
+    cached = _cached_response(key, model)
+    if cached is not None:
+        return cached
+
+    async with limiter or _NoLimit():
+        response = await client.chat.completions.create(
+            model=model,
+            messages=_messages(system_prompt, user_prompt),
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+    content = response.choices[0].message.content.strip()
+    if key is not None:
+        get_llm_cache().set(key, content.encode("utf-8"), model=model)
+    return content
+
+
+def _stream(client, model: str, system_prompt: str, user_prompt: str, max_tokens: int,
+            temperature: float, timeout: Optional[float] = None) -> Iterator[str]:
+    """
+    `_complete` as a stream: yield the completion's text pieces as the API sends them.
+
+    A cached response is yielded whole. Time to first token and total latency
+    are logged. With `timeout`, the response is closed and TimeoutError raised
+    once that many seconds have passed.
+    """
+    key = _cache_key(model, system_prompt, user_prompt, max_tokens, temperature)
+    cached = _cached_response(key, model)
+    if cached is not None:
+        yield cached
+        return
+
+    started = time.perf_counter()
+    first_token = None
+    parts = []
+    # Leaving the block (even when the caller stops reading early) closes the response.
+    with client.chat.completions.create(
+        model=model,
+        messages=_messages(system_prompt, user_prompt),
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True,
+        # Also bounds how long to wait for any one chunk
+        **({"timeout": timeout} if timeout is not None else {}),
+    ) as stream:
+        for chunk in stream:
+            if timeout is not None and time.perf_counter() - started > timeout:
+                raise TimeoutError(f"timed out after {timeout:g}s")
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            parts.append(delta)
+            yield delta
+    total = time.perf_counter() - started
+    content = "".join(parts).strip()
+    logger.info(
+        f"Streamed {model} completion ({len(content)} chars): "
+        f"first token after {first_token if first_token is not None else total:.2f}s, total {total:.2f}s"
+    )
+    if key is not None:
+        get_llm_cache().set(key, content.encode("utf-8"), model=model)
+
+
+class CompletionStream:
+    """
+    A completion read while it is generated.
+
+    Iterating yields its text as it arrives. Once iteration ends, `text` holds
+    the finished result, cleaned up the same way the blocking function cleans
+    it, or that function's error message if the request failed.
+    """
+
+    def __init__(self, pieces: Iterable[str], finish: Callable[[str], str],
+                 on_error: Callable[[Exception], str]):
+        self._pieces = pieces
+        self._finish = finish
+        self._on_error = on_error
+        self.text = None
+        self.error = None
+
+    @classmethod
+    def of(cls, text: str) -> "CompletionStream":
+        """A stream of an already known result, such as a configuration error."""
+        return cls([text], lambda _: text, str)
+
+    def __iter__(self) -> Iterator[str]:
+        parts = []
+        try:
+            for piece in self._pieces:
+                parts.append(piece)
+                yield piece
+        except Exception as e:
+            self.error = str(e)
+            self.text = self._on_error(e)
+            return
+        self.text = self._finish("".join(parts))
+
+    def close(self):
+        """Stop reading early and close the underlying response."""
+        if hasattr(self._pieces, "close"):
+            self._pieces.close()
+
+
+def llm_cache_stats() -> dict:
+    """Hit/miss counts of the LLM response cache in this process, plus its size."""
+    stats = get_llm_cache().stats()
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+def _summary_request(text: str) -> dict:
+    prompt = f"Summarize the following text for key points and relevant details:\n{text}\n"
+    return {
+        "model": "llama3-8b-8192",
+        "system_prompt": "You are a helpful assistant that summarizes text concisely.",
+        "user_prompt": prompt,
+        "max_tokens": 150,
+        "temperature": 0.7,
+    }
+
+
 def summarize_text(text: str) -> str:
     """
     Summarize the input text using Groq LLM.
@@ -39,17 +240,14 @@ def summarize_text(text: str) -> str:
         return "Summarization unavailable: Please configure a Groq API key."
 
     try:
-        prompt = f"Summarize the following text for key points and relevant details:\n{text}\n"
-        response = client.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that summarizes text concisely."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150,
-            temperature=0.7
-        )
-        summary = response.choices[0].message.content.strip()
+        from logic.summarize import fits_in_one_request, map_reduce_summary
+
+        if fits_in_one_request(text):
+            summary = _complete(client, **_summary_request(text))
+        else:
+            # Too long for the model's window: summarize chunks concurrently on the async client.
+            manager = get_client_manager()
+            summary = manager.run(map_reduce_summary(manager.get_async(), text))
         logger.info("Text summarized successfully")
         return summary
     except Exception as e:
@@ -57,9 +255,28 @@ def summarize_text(text: str) -> str:
         return f"Summarization failed: {str(e)}"
 
 
-def generate_test_cases(text_content: str) -> str:
-    """Generate comprehensive, BDD-style Gherkin test cases from text."""
-    
+async def summarize_text_async(text: str) -> str:
+    """`summarize_text` on the async Groq client; run it with `get_client_manager().run()`."""
+    client = get_client_manager().get_async()
+    if not client:
+        logger.warning("No Groq API key provided; summarization skipped.")
+        return "Summarization unavailable: Please configure a Groq API key."
+
+    try:
+        from logic.summarize import fits_in_one_request, map_reduce_summary
+
+        if fits_in_one_request(text):
+            summary = await _acomplete(client, **_summary_request(text))
+        else:
+            summary = await map_reduce_summary(client, text)
+        logger.info("Text summarized successfully")
+        return summary
+    except Exception as e:
+        logger.error(f"LLM summarization error: {str(e)}", exc_info=True)
+        return f"Summarization failed: {str(e)}"
+
+
+def _test_case_request(text_content: str) -> dict:
     system_prompt = """
 You are a senior QA automation engineer specializing in Behavior-Driven Development (BDD). Your task is to analyze the provided application description and create a comprehensive Gherkin feature file for it.
 
@@ -80,22 +297,23 @@ Application Description:
 {text_content}
 ---
 """
+    return {
+        "model": "llama3-70b-8192",
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+        "max_tokens": 4096,
+        "temperature": 0.0,
+    }
 
+
+def generate_test_cases(text_content: str) -> str:
+    """Generate comprehensive, BDD-style Gherkin test cases from text."""
     client = get_groq_client()
     if not client:
         return "Error: Groq API key not configured."
 
     try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            max_tokens=4096,
-            temperature=0.0,
-        )
-        gherkin_text = response.choices[0].message.content.strip()
+        gherkin_text = _complete(client, **_test_case_request(text_content))
         logger.info("Comprehensive Gherkin test cases generated successfully.")
         return gherkin_text
     except Exception as e:
@@ -103,9 +321,32 @@ Application Description:
         return f"Error: Failed to generate test cases. Details: {str(e)}"
 
 
-def generate_automation_script(gherkin_content: str) -> str:
-    """Generate a structured, BDD-style automation script from Gherkin."""
-    
+def _test_cases_done(gherkin_text: str) -> str:
+    logger.info("Comprehensive Gherkin test cases generated successfully.")
+    return gherkin_text.strip()
+
+
+def _test_cases_failed(e: Exception) -> str:
+    logger.error(f"Gherkin generation failed: {str(e)}", exc_info=True)
+    return f"Error: Failed to generate test cases. Details: {str(e)}"
+
+
+def stream_test_cases(text_content: str, timeout: Optional[float] = None) -> CompletionStream:
+    """
+    `generate_test_cases`, yielding the Gherkin as it is generated.
+
+    With `timeout`, a generation still running after that many seconds is
+    stopped and `text` is the usual error message.
+    """
+    client = get_groq_client()
+    if not client:
+        return CompletionStream.of("Error: Groq API key not configured.")
+    return CompletionStream(
+        _stream(client, **_test_case_request(text_content), timeout=timeout), _test_cases_done, _test_cases_failed,
+    )
+
+
+def _automation_request(gherkin_content: str) -> dict:
     system_prompt = """
 You are a senior QA automation engineer specializing in BDD. Your task is to convert a Gherkin feature file into a single, runnable Python test script using Playwright, following a strict template.
 
@@ -182,37 +423,94 @@ Please convert the following Gherkin content into a complete Python Playwright s
 Gherkin Content:
 {gherkin_content}
 """
+    return {
+        "model": "llama3-70b-8192", # Using a more powerful model for this complex task
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+        "max_tokens": 4096,
+        "temperature": 0.0,
+    }
+
+
+def _clean_script(script_text: str) -> str:
+    """Strip the markdown fence and any preamble the model put around the code."""
+    if script_text.startswith("```python"):
+        script_text = script_text[9:].strip()
+
+    if script_text.endswith("```"):
+        script_text = script_text[:-3].strip()
+
+    # Find the start of the actual code block
+    if "import" in script_text:
+        script_text = script_text[script_text.find("import"):]
+    return script_text
+
+
+def generate_automation_script(gherkin_content: str) -> str:
+    """Generate a structured, BDD-style automation script from Gherkin."""
     client = get_groq_client()
     if not client:
         logger.warning("No Groq API key provided; script generation skipped.")
         return "# Groq API key not configured. Cannot generate script."
 
     try:
-        response = client.chat.completions.create(
-            model="llama3-70b-8192", # Using a more powerful model for this complex task
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=4096,
-            temperature=0.0,
-        )
-        
-        script_text = response.choices[0].message.content.strip()
-        
-        if script_text.startswith("```python"):
-            script_text = script_text[9:].strip()
-        
-        if script_text.endswith("```"):
-            script_text = script_text[:-3].strip()
-
-        # Find the start of the actual code block
-        if "import" in script_text:
-            script_text = script_text[script_text.find("import"):]
-
+        script_text = _clean_script(_complete(client, **_automation_request(gherkin_content)))
         logger.info("Generated BDD-style automation script.")
         return script_text
         
     except Exception as e:
         logger.error(f"Automation script generation error: {str(e)}", exc_info=True)
         return f"# Error generating script: {str(e)}"
+
+
+def _script_done(script_text: str) -> str:
+    logger.info("Generated BDD-style automation script.")
+    return _clean_script(script_text.strip())
+
+
+def _script_failed(e: Exception) -> str:
+    logger.error(f"Automation script generation error: {str(e)}", exc_info=True)
+    return f"# Error generating script: {str(e)}"
+
+
+def stream_automation_script(gherkin_content: str) -> CompletionStream:
+    """
+    `generate_automation_script`, yielding the code as it is generated.
+
+    The pieces are the model's raw output (including any markdown fence);
+    `text` is the cleaned script once the stream is read.
+    """
+    client = get_groq_client()
+    if not client:
+        logger.warning("No Groq API key provided; script generation skipped.")
+        return CompletionStream.of("# Groq API key not configured. Cannot generate script.")
+    return CompletionStream(_stream(client, **_automation_request(gherkin_content)), _script_done, _script_failed)
+
+
+def stream_analysis(text: str, timeout: float = ANALYSIS_TIMEOUT_SECONDS) -> Tuple[CompletionStream, Callable[[], str]]:
+    """
+    Summarize `text` and generate its test cases concurrently, streaming the test cases.
+
+    The summary is generated in the background on the async client while the
+    caller reads the test-case stream, so the wait is about the slower of the
+    two rather than their sum. Both share one `timeout` budget: whatever
+    hasn't finished within it is stopped and reported as an error string, the
+    same way the blocking functions report failures.
+
+    Returns:
+        (test_cases, summary): iterate `test_cases` first, then call `summary()`
+        for the summary (it waits at most for what is left of the budget).
+    """
+    deadline = time.monotonic() + timeout
+    summary_future = get_client_manager().submit(summarize_text_async(text))
+    test_cases = stream_test_cases(text, timeout=timeout)
+
+    def summary() -> str:
+        try:
+            return summary_future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except concurrent.futures.TimeoutError:
+            summary_future.cancel()
+            logger.warning(f"LLM analysis hit its {timeout:g}s budget before the summary finished")
+            return f"Summarization failed: timed out after {timeout:g}s"
+
+    return test_cases, summary
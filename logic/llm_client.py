@@ -0,0 +1,276 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from logic.util import get_project_root
+
+logger = logging.getLogger(__name__)
+
+# Connections kept open to the Groq API between calls, and for how long an idle one is kept.
+MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "10"))
+KEEPALIVE_SECONDS = float(os.getenv("GROQ_KEEPALIVE_SECONDS", "120"))
+# The Groq SDK's own defaults.
+REQUEST_TIMEOUT_SECONDS = 60.0
+CONNECT_TIMEOUT_SECONDS = 5.0
+
+_CONNECT_STARTED = ("connection.connect_tcp.started", "connection.start_tls.started")
+_CONNECT_COMPLETE = ("connection.connect_tcp.complete", "connection.start_tls.complete")
+
+# The trace of the last request sent from the current thread or asyncio task.
+_last_trace = contextvars.ContextVar("groq_last_trace", default=None)
+
+
+class RequestTrace:
+    """Whether one HTTP request opened a new connection, and what that cost."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.new_connection = False
+        self.tls_handshake = False
+        self.connect_seconds = 0.0
+        self.first_byte_seconds = None
+        self._step_started = None
+
+    def __call__(self, event_name: str, info: dict):
+        # httpcore's "trace" extension reports each step of sending a request.
+        if event_name in _CONNECT_STARTED:
+            self.new_connection = True
+            self.tls_handshake = self.tls_handshake or event_name == "connection.start_tls.started"
+            self._step_started = time.perf_counter()
+        elif event_name in _CONNECT_COMPLETE and self._step_started is not None:
+            self.connect_seconds += time.perf_counter() - self._step_started
+            self._step_started = None
+
+    def to_dict(self) -> dict:
+        return {
+            "reused": not self.new_connection,
+            "tls_handshake": self.tls_handshake,
+            "connect_ms": round(self.connect_seconds * 1000, 2),
+            "first_byte_ms": None if self.first_byte_seconds is None else round(self.first_byte_seconds * 1000, 2),
+        }
+
+
+class AsyncRequestTrace(RequestTrace):
+    """`RequestTrace` for the async client, whose transport awaits the trace callback."""
+
+    async def __call__(self, event_name: str, info: dict):
+        RequestTrace.__call__(self, event_name, info)
+
+
+class GroqClientManager:
+    """
+    One Groq client per process, built on first use and kept for every later call.
+
+    The client owns a keep-alive HTTP connection pool, so calls after the first
+    skip the TCP and TLS handshakes. The API key is looked up on each `get()`
+    (environment first, then `.streamlit/secrets.toml`, which is only re-read
+    when it changes on disk) and the client is rebuilt only when the key changes.
+
+    The async client (`get_async()`) lives on an event loop owned by the
+    manager, so its connections survive callers that each start their own
+    loop (every Streamlit rerun); coroutines using it are run with `run()`.
+
+    Args:
+        base_url: API endpoint; defaults to the SDK's (or `GROQ_BASE_URL`).
+        verify: TLS verification passed to httpx, e.g. an `ssl.SSLContext` trusting a local endpoint.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, verify=True):
+        self.base_url = base_url
+        self.verify = verify
+        self._client = None
+        self._http_client = None
+        self._client_key = None
+        self._async_client = None
+        self._async_http_client = None
+        self._async_client_key = None
+        self._loop = None
+        self._secrets = (None, None)  # (stat signature, key)
+        self._lock = threading.Lock()
+        self._stats = {
+            "client_builds": 0,
+            "requests": 0,
+            "reused_connections": 0,
+            "new_connections": 0,
+            "tls_handshakes": 0,
+            "connect_seconds": 0.0,
+        }
+
+    # --- API key ---
+    def _secrets_key(self) -> Optional[str]:
+        secrets_path = get_project_root() / ".streamlit" / "secrets.toml"
+        try:
+            stat = secrets_path.stat()
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._secrets[0] != signature:
+            import toml
+
+            with open(secrets_path, "r") as f:
+                self._secrets = (signature, toml.load(f).get("GROQ_API_KEY"))
+        return self._secrets[1]
+
+    def api_key(self) -> Optional[str]:
+        return os.getenv("GROQ_API_KEY") or self._secrets_key()
+
+    # --- client ---
+    def _http_options(self) -> dict:
+        import httpx
+
+        return {
+            "limits": httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_SECONDS,
+            ),
+            "timeout": httpx.Timeout(REQUEST_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+            "follow_redirects": True,
+            "verify": self.verify,
+        }
+
+    def _build(self, api_key: str):
+        import httpx
+        from groq import Groq
+
+        self._http_client = httpx.Client(
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+            **self._http_options(),
+        )
+        self._stats["client_builds"] += 1
+        logger.info(f"Created Groq client (pool of {MAX_CONNECTIONS} keep-alive connections)")
+        return Groq(api_key=api_key, base_url=self.base_url, http_client=self._http_client)
+
+    def _build_async(self, api_key: str):
+        import httpx
+        from groq import AsyncGroq
+
+        self._async_http_client = httpx.AsyncClient(
+            event_hooks={"request": [self._on_request_async], "response": [self._on_response_async]},
+            **self._http_options(),
+        )
+        self._stats["client_builds"] += 1
+        logger.info(f"Created async Groq client (pool of {MAX_CONNECTIONS} keep-alive connections)")
+        return AsyncGroq(api_key=api_key, base_url=self.base_url, http_client=self._async_http_client)
+
+    def get(self):
+        """Return the shared Groq client, or None when no API key is configured."""
+        api_key = self.api_key()
+        if not api_key:
+            return None
+        with self._lock:
+            if self._client is None or api_key != self._client_key:
+                if self._client is not None:
+                    logger.info("Groq API key changed; rebuilding the client")
+                    self._close_locked()
+                self._client = self._build(api_key)
+                self._client_key = api_key
+            return self._client
+
+    def get_async(self):
+        """
+        Return the shared AsyncGroq client, or None when no API key is configured.
+
+        Only use it in coroutines passed to `run()`: its connections belong to the manager's event loop.
+        """
+        api_key = self.api_key()
+        if not api_key:
+            return None
+        with self._lock:
+            if self._async_client is None or api_key != self._async_client_key:
+                if self._async_client is not None:
+                    logger.info("Groq API key changed; rebuilding the async client")
+                    self._close_async_locked()
+                self._async_client = self._build_async(api_key)
+                self._async_client_key = api_key
+            return self._async_client
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="groq-async", daemon=True).start()
+            return self._loop
+
+    def submit(self, coroutine) -> concurrent.futures.Future:
+        """Start a coroutine on the manager's event loop; cancelling the future cancels it."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._event_loop())
+
+    def run(self, coroutine, timeout: Optional[float] = None):
+        """Run a coroutine on the manager's event loop and return its result."""
+        return self.submit(coroutine).result(timeout)
+
+    def _close_locked(self):
+        if self._http_client is not None:
+            self._http_client.close()
+        self._client = self._http_client = self._client_key = None
+
+    def _close_async_locked(self):
+        if self._async_http_client is not None and self._loop is not None:
+            http_client = self._async_http_client
+            asyncio.run_coroutine_threadsafe(http_client.aclose(), self._loop)
+        self._async_client = self._async_http_client = self._async_client_key = None
+
+    def close(self):
+        """Close the clients and their pooled connections; the next `get()` builds a new one."""
+        with self._lock:
+            self._close_locked()
+            self._close_async_locked()
+
+    # --- metrics ---
+    def _on_request(self, request, trace_class=RequestTrace):
+        trace = trace_class()
+        request.extensions["trace"] = trace
+        _last_trace.set(trace)
+
+    async def _on_request_async(self, request):
+        self._on_request(request, AsyncRequestTrace)
+
+    async def _on_response_async(self, response):
+        self._on_response(response)
+
+    def _on_response(self, response):
+        trace = response.request.extensions.get("trace")
+        if not isinstance(trace, RequestTrace):
+            return
+        trace.first_byte_seconds = time.perf_counter() - trace.started
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["reused_connections" if not trace.new_connection else "new_connections"] += 1
+            self._stats["tls_handshakes"] += int(trace.tls_handshake)
+            self._stats["connect_seconds"] += trace.connect_seconds
+        logger.debug(
+            f"Groq {response.request.method} {response.request.url.path}: "
+            f"{'new' if trace.new_connection else 'reused'} connection, "
+            f"connect {trace.connect_seconds * 1000:.1f}ms, first byte {trace.first_byte_seconds * 1000:.1f}ms"
+        )
+
+    def last_request(self) -> Optional[dict]:
+        """Connection reuse and timings of the last request sent from this thread (or asyncio task)."""
+        trace = _last_trace.get()
+        return trace.to_dict() if trace is not None else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["connect_seconds"] = round(stats["connect_seconds"], 4)
+        stats["reuse_rate"] = stats["reused_connections"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_client_manager() -> GroqClientManager:
+    """Return the process-wide Groq client manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = GroqClientManager()
+        return _manager
@@ -0,0 +1,153 @@
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+OCR_LANG = "eng"
+OCR_CONFIG = "--psm 6"
+
+# "auto" prefers the in-process tesserocr engine and falls back to pytesseract.
+OCR_BACKEND = os.getenv("OCR_BACKEND", "auto").lower()
+# Deskew, crop and rescale images before OCR (see logic/preprocess.py).
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1").lower() not in ("0", "false", "no", "off")
+
+
+def _page_segmentation_mode(config: str) -> int:
+    match = re.search(r"--psm\s+(\d+)", config)
+    return int(match.group(1)) if match else 3
+
+
+class OcrBackend:
+    """Turns a PIL image into text."""
+
+    name = "base"
+
+    def image_to_text(self, image) -> str:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PytesseractBackend(OcrBackend):
+    """Runs the `tesseract` CLI once per image (reloads traineddata every call)."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str = OCR_LANG, config: str = OCR_CONFIG):
+        import pytesseract
+
+        self._pytesseract = pytesseract
+        self.lang = lang
+        self.config = config
+
+    def image_to_text(self, image) -> str:
+        return self._pytesseract.image_to_string(image, lang=self.lang, config=self.config)
+
+
+class TesserocrBackend(OcrBackend):
+    """
+    Keeps a Tesseract engine loaded in-process and hands it PIL images directly.
+
+    `PyTessBaseAPI` is not thread-safe, so each thread gets its own engine; a
+    worker process therefore loads the language data once per thread instead of
+    once per image.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = OCR_LANG, config: str = OCR_CONFIG):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self.lang = lang
+        self.psm = _page_segmentation_mode(config)
+        self._local = threading.local()
+        self._apis = []
+        self._apis_lock = threading.Lock()
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(lang=self.lang, psm=self.psm)
+            self._local.api = api
+            with self._apis_lock:
+                self._apis.append(api)
+        return api
+
+    def image_to_text(self, image) -> str:
+        api = self._api()
+        api.SetImage(image)
+        try:
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def close(self):
+        with self._apis_lock:
+            for api in self._apis:
+                api.End()
+            self._apis.clear()
+        self._local = threading.local()
+
+
+_BACKENDS = {"tesserocr": TesserocrBackend, "pytesseract": PytesseractBackend}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+_resolved_backend = None
+_resolve_lock = threading.Lock()
+
+
+def resolve_ocr_backend(name: str = OCR_BACKEND) -> str:
+    """
+    The backend `name` stands for: "auto" becomes "tesserocr" if an engine can be loaded, else "pytesseract".
+
+    The answer is part of the extraction cache options, since the two engines
+    can read the same image differently. "auto" is probed once per process by
+    loading (and releasing) a tesserocr engine.
+    """
+    global _resolved_backend
+    if name != "auto":
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown OCR backend: {name}")
+        return name
+    with _resolve_lock:
+        if _resolved_backend is None:
+            try:
+                import tesserocr
+
+                tesserocr.PyTessBaseAPI(lang=OCR_LANG).End()
+                _resolved_backend = "tesserocr"
+            except Exception as e:
+                logger.info(f"tesserocr unavailable ({str(e)}); using pytesseract for OCR")
+                _resolved_backend = "pytesseract"
+        return _resolved_backend
+
+
+def create_ocr_backend(name: str = OCR_BACKEND) -> OcrBackend:
+    """Create an OCR backend by name ("auto", "tesserocr" or "pytesseract")."""
+    return _BACKENDS[resolve_ocr_backend(name)]()
+
+
+def get_ocr_backend() -> OcrBackend:
+    """Return this process's shared OCR backend, creating it on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_ocr_backend()
+            logger.info(f"Using OCR backend: {_backend.name}")
+        return _backend
+
+
+def ocr_image(image, preprocess: bool = OCR_PREPROCESS) -> str:
+    """Run OCR on a PIL image (preprocessed unless disabled) and return the stripped text."""
+    if preprocess:
+        from logic.preprocess import preprocess_for_ocr
+
+        image = preprocess_for_ocr(image)
+    return get_ocr_backend().image_to_text(image).strip()
@@ -0,0 +1,440 @@
+import hashlib
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from logic.ocr import ocr_image
+
+logger = logging.getLogger(__name__)
+
+# Documents shorter than this are extracted in-process; the pool is not worth it.
+PARALLEL_PAGE_THRESHOLD = 8
+OCR_DPI = 300
+# A page with a text layer is treated as mixed when images cover at least this
+# fraction of it, since scanned content is often pasted next to typed text.
+MIXED_IMAGE_COVERAGE = 0.25
+# Images smaller than this (in points, per side) are logos/bullets and not worth OCR.
+MIN_OCR_IMAGE_SIDE = 72
+# Characters whose baselines are this close (in points) are on the same line, as in pdfplumber.
+LINE_TOLERANCE = 3
+# A gap wider than this (in points) between characters starts a new word, as pdfplumber's x_tolerance.
+WORD_GAP_TOLERANCE = 3
+# Expanded ligatures put the second glyph this little (in points) before the first; not a step back.
+BACKSTEP_TOLERANCE = 0.01
+# Keep only the spaces the PDF has; word gaps are found by `page_text`, not inferred by MuPDF.
+WORD_FLAGS = (fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE
+              | fitz.TEXT_MEDIABOX_CLIP | fitz.TEXT_INHIBIT_SPACES)
+# Peak memory allowed for page bitmaps waiting for or undergoing OCR, per worker.
+OCR_MEMORY_LIMIT_MB = int(os.getenv("PDF_OCR_MEMORY_MB", "256"))
+OCR_MAX_QUEUE_DEPTH = 4
+
+PAGE_TEXT = "text"
+PAGE_IMAGE = "image"
+PAGE_MIXED = "mixed"
+PAGE_EMPTY = "empty"
+
+
+class PageResult:
+    """Text extracted from one PDF page, how the page was classified and how it was extracted."""
+
+    def __init__(self, page_number: int, text: str, method: str, kind: str = "", seconds: float = 0.0):
+        self.page_number = page_number
+        self.text = text
+        self.method = method
+        self.kind = kind
+        self.seconds = seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "page": self.page_number + 1,
+            "kind": self.kind,
+            "method": self.method,
+            "seconds": round(self.seconds, 4),
+            "chars": len(self.text),
+        }
+
+    def __repr__(self):
+        return (
+            f"PageResult(page={self.page_number}, kind={self.kind!r}, method={self.method!r}, "
+            f"chars={len(self.text)}, seconds={self.seconds:.3f})"
+        )
+
+
+def default_worker_count() -> int:
+    configured = os.getenv("PDF_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return max(1, os.cpu_count() or 1)
+
+
+def split_page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Split `[0, page_count)` into contiguous half-open ranges.
+
+    Ranges are sized to give each worker a few of them, so a worker that draws
+    slow (scanned) pages does not hold up the whole document.
+    """
+    if page_count <= 0:
+        return []
+    target_ranges = max(1, workers * 4)
+    size = max(1, math.ceil(page_count / target_ranges))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _render_for_ocr(page, clip, max_bytes: int) -> Image.Image:
+    """Render a page (or a clip of it) to a grayscale image no larger than `max_bytes`."""
+    rect = clip if clip is not None else page.rect
+    dpi = OCR_DPI
+    estimated = (rect.width / 72 * dpi) * (rect.height / 72 * dpi)
+    if estimated > max_bytes:
+        dpi = max(72, int(dpi * math.sqrt(max_bytes / estimated)))
+        logger.info(f"Rendering page {page.number + 1} at {dpi} dpi to stay under the OCR memory ceiling")
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, clip=clip)
+    image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    del pix
+    return image
+
+
+def _bitmap_bytes(page, clip) -> float:
+    rect = clip if clip is not None else page.rect
+    return (rect.width / 72 * OCR_DPI) * (rect.height / 72 * OCR_DPI)
+
+
+def stream_ocr(
+    doc, jobs: List[Tuple[int, Optional[fitz.Rect]]], memory_limit_mb: Optional[int] = None
+) -> Iterator[Tuple[int, str]]:
+    """
+    OCR `(page_number, clip)` jobs through a bounded rasterize -> OCR -> release pipeline.
+
+    A background thread renders one page (or clip) at a time into a bounded
+    queue while the caller's thread runs OCR, so at most `depth + 2` bitmaps are
+    alive at once. Queue depth and, if necessary, render resolution are chosen
+    so those bitmaps fit in `memory_limit_mb`. Only the render thread touches
+    `doc` while the pipeline is running.
+
+    Yields:
+        (page_number, text) in job order.
+    """
+    if not jobs:
+        return
+    limit_bytes = (memory_limit_mb or OCR_MEMORY_LIMIT_MB) * 1024 * 1024
+    largest = max(_bitmap_bytes(doc.load_page(n), clip) for n, clip in jobs)
+    depth = int(max(1, min(OCR_MAX_QUEUE_DEPTH, limit_bytes // max(largest, 1) - 2)))
+    max_image_bytes = limit_bytes // (depth + 2)
+
+    pending = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def render():
+        try:
+            for page_number, clip in jobs:
+                if stop.is_set():
+                    return
+                try:
+                    item = (page_number, _render_for_ocr(doc.load_page(page_number), clip, max_image_bytes))
+                except Exception as e:
+                    item = (page_number, e)
+                while not stop.is_set():
+                    try:
+                        pending.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                del item
+        finally:
+            while not stop.is_set():
+                try:
+                    pending.put(done, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    renderer = threading.Thread(target=render, name="pdf-ocr-render", daemon=True)
+    renderer.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is done:
+                break
+            page_number, image = item
+            del item
+            if isinstance(image, Exception):
+                logger.warning(f"Rendering page {page_number + 1} for OCR failed: {str(image)}")
+                yield page_number, ""
+                continue
+            try:
+                text = ocr_image(image)
+            except Exception as e:
+                logger.warning(f"OCR failed on page {page_number + 1}: {str(e)}")
+                text = ""
+            finally:
+                image.close()
+                del image
+            yield page_number, text
+    finally:
+        stop.set()
+        renderer.join()
+
+
+def _image_regions(page) -> list:
+    """Bounding boxes of the images drawn on `page` that are big enough to hold text."""
+    regions = []
+    for info in page.get_image_info():
+        rect = fitz.Rect(info["bbox"]) & page.rect
+        if rect.width >= MIN_OCR_IMAGE_SIDE and rect.height >= MIN_OCR_IMAGE_SIDE:
+            regions.append(rect)
+    return regions
+
+
+def page_text(page) -> str:
+    """
+    The page's text layer, laid out the way pdfplumber's `extract_text()` lays it out.
+
+    Words are grouped into lines by baseline and joined with single spaces, so
+    text pages come out as they did when pdfplumber extracted them.
+    """
+    lines = []
+    for word in sorted(_page_words(page), key=lambda w: w[1]):
+        if lines and word[1] - lines[-1][0] <= LINE_TOLERANCE:
+            lines[-1][1].append(word)
+        else:
+            lines.append((word[1], [word]))
+    return "\n".join(" ".join(w[2] for w in sorted(words, key=lambda w: w[0])) for _, words in lines).strip()
+
+
+def _page_words(page) -> list:
+    """
+    `(x0, baseline, text)` for each word on the page.
+
+    Like pdfplumber, a word ends at a space and wherever the next character
+    starts more than WORD_GAP_TOLERANCE past the previous one or steps back, so
+    table cells and columns without a literal space between them stay apart.
+    """
+    words = []
+    start, text, previous = None, "", None
+    for block in page.get_text("rawdict", flags=WORD_FLAGS)["blocks"]:
+        for line in block.get("lines", []):
+            for span in line["spans"]:
+                for char in span["chars"]:
+                    bbox, c = char["bbox"], char["c"]
+                    if text and (
+                        c.isspace()
+                        or bbox[0] < previous[0] - BACKSTEP_TOLERANCE
+                        or bbox[0] > previous[2] + WORD_GAP_TOLERANCE
+                        or abs(bbox[3] - previous[3]) > LINE_TOLERANCE
+                    ):
+                        words.append((start[0], start[3], text))
+                        text = ""
+                    if not c.isspace():
+                        if not text:
+                            start = bbox
+                        text += c
+                    previous = bbox
+    if text:
+        words.append((start[0], start[3], text))
+    return words
+
+
+def classify_page(page, text: str, regions: list) -> str:
+    """
+    Classify a page from its native text layer and image placements.
+
+    Both inputs come from PyMuPDF's cheap inspection calls; nothing is rendered.
+    """
+    page_area = abs(page.rect) or 1.0
+    coverage = min(1.0, sum(abs(r) for r in regions) / page_area)
+    if text:
+        return PAGE_MIXED if regions and coverage >= MIXED_IMAGE_COVERAGE else PAGE_TEXT
+    return PAGE_IMAGE if regions else PAGE_EMPTY
+
+
+def _inspect_page(page, file_path: str, page_number: int, plumber_state: dict):
+    """
+    Classify a page and extract what can be had without rendering.
+
+    Returns:
+        (PageResult, ocr_jobs) where `ocr_jobs` lists the `(page_number, clip)`
+        regions still to be OCRed (clip is None for the whole page).
+    """
+    text = page_text(page)
+    regions = _image_regions(page)
+    kind = classify_page(page, text, regions)
+
+    if kind == PAGE_TEXT:
+        return PageResult(page_number, text, "pymupdf", kind), []
+
+    if kind == PAGE_MIXED:
+        # Keep the text layer and OCR only the image regions.
+        return PageResult(page_number, text, "pymupdf", kind), [(page_number, rect) for rect in regions]
+
+    if kind == PAGE_EMPTY:
+        # No text layer and no images: pdfminer occasionally recovers text PyMuPDF misses.
+        try:
+            if plumber_state.get("pdf") is None:
+                import pdfplumber
+                plumber_state["pdf"] = pdfplumber.open(file_path)
+            text = (plumber_state["pdf"].pages[page_number].extract_text() or "").strip()
+        except Exception as e:
+            logger.warning(f"pdfplumber failed on page {page_number + 1}: {str(e)}")
+            text = ""
+        if text:
+            return PageResult(page_number, text, "pdfplumber", kind), []
+        if not page.get_drawings():
+            return PageResult(page_number, "", "none", kind), []
+
+    return PageResult(page_number, "", "ocr", kind), [(page_number, None)]
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[PageResult]:
+    """Extract pages `[start, stop)`, OCRing only the pages (or regions) that need it."""
+    return _extract_pages(file_path, list(range(start, stop)))
+
+
+def _extract_pages(file_path: str, page_numbers: List[int]) -> List[PageResult]:
+    """Extract the given pages, OCRing only the pages (or regions) that need it."""
+    results = {}
+    ocr_jobs = []
+    plumber_state = {}
+    doc = fitz.open(file_path)
+    try:
+        for page_number in page_numbers:
+            started = time.perf_counter()
+            result, jobs = _inspect_page(doc.load_page(page_number), file_path, page_number, plumber_state)
+            result.seconds = time.perf_counter() - started
+            results[page_number] = result
+            ocr_jobs.extend(jobs)
+
+        started = time.perf_counter()
+        for page_number, text in stream_ocr(doc, ocr_jobs):
+            finished = time.perf_counter()
+            result = results[page_number]
+            result.seconds += finished - started
+            started = finished
+            if not text:
+                continue
+            if result.kind == PAGE_MIXED:
+                result.method = "pymupdf+ocr"
+            result.text = f"{result.text}\n{text}" if result.text else text
+    finally:
+        doc.close()
+        if plumber_state.get("pdf") is not None:
+            plumber_state["pdf"].close()
+    return [results[n] for n in page_numbers]
+
+
+def page_report(pages: List[PageResult]) -> dict:
+    """Summarize which method handled each page and how long it took."""
+    methods = {}
+    for page in pages:
+        summary = methods.setdefault(page.method, {"pages": 0, "seconds": 0.0})
+        summary["pages"] += 1
+        summary["seconds"] = round(summary["seconds"] + page.seconds, 4)
+    return {"pages": [page.to_dict() for page in pages], "methods": methods}
+
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    # One pool per worker count, kept for the life of the process: another thread may still be
+    # using a pool when a caller asks for a different size, so pools are never swapped out.
+    with _executor_lock:
+        if workers not in _executors:
+            # Spawned, not forked: callers (Streamlit, ingest thread pools) are multithreaded.
+            _executors[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executors[workers]
+
+
+def iter_pdf_pages(file_path: Path, max_workers: Optional[int] = None) -> Iterator[PageResult]:
+    """
+    Yield every page of a PDF in page order, spreading page ranges across worker processes.
+
+    Each range is yielded as soon as it and all ranges before it are done, so
+    callers can start on the first pages before the whole document is finished.
+    """
+    file_path = str(file_path)
+    with fitz.open(file_path) as doc:
+        if doc.needs_pass:
+            raise ValueError("PDF is encrypted")
+        page_count = doc.page_count
+
+    workers = max_workers or default_worker_count()
+    if workers == 1 or page_count < PARALLEL_PAGE_THRESHOLD:
+        for start, stop in split_page_ranges(page_count, 1):
+            yield from _extract_page_range(file_path, start, stop)
+        return
+
+    ranges = split_page_ranges(page_count, workers)
+    logger.info(f"Extracting {page_count} PDF pages in {len(ranges)} ranges across {workers} workers")
+    executor = _get_executor(workers)
+    futures = [executor.submit(_extract_page_range, file_path, start, stop) for start, stop in ranges]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_pdf_pages(file_path: Path, max_workers: Optional[int] = None) -> List[PageResult]:
+    """Extract every page of a PDF in page order (see `iter_pdf_pages`)."""
+    return list(iter_pdf_pages(file_path, max_workers))
+
+
+def extract_selected_pages(
+    file_path: Path, page_numbers: List[int], max_workers: Optional[int] = None
+) -> List[PageResult]:
+    """Extract only the given (0-based) pages, in the order given, in parallel when there are many."""
+    file_path = str(file_path)
+    if not page_numbers:
+        return []
+    workers = max_workers or default_worker_count()
+    if workers == 1 or len(page_numbers) < PARALLEL_PAGE_THRESHOLD:
+        return _extract_pages(file_path, page_numbers)
+
+    executor = _get_executor(workers)
+    futures = [
+        executor.submit(_extract_pages, file_path, page_numbers[start:stop])
+        for start, stop in split_page_ranges(len(page_numbers), workers)
+    ]
+    return [page for future in futures for page in future.result()]
+
+
+def page_fingerprints(file_path: Path) -> List[str]:
+    """
+    Hash what each page is made of without extracting or rendering anything.
+
+    A page's fingerprint covers its content streams (text and drawing
+    operators), its geometry and the raw bytes of every image it shows, so an
+    edit anywhere on the page changes it while untouched pages keep theirs.
+    """
+    image_hashes = {}
+    fingerprints = []
+    with fitz.open(str(file_path)) as doc:
+        if doc.needs_pass:
+            raise ValueError("PDF is encrypted")
+        for page in doc:
+            digest = hashlib.sha256()
+            digest.update(f"{tuple(page.rect)}|{page.rotation}|".encode("utf-8"))
+            digest.update(page.read_contents())
+            for image in page.get_images(full=True):
+                xref = image[0]
+                if xref not in image_hashes:
+                    image_hashes[xref] = hashlib.sha256(doc.xref_stream_raw(xref) or b"").hexdigest()
+                digest.update(image_hashes[xref].encode("utf-8"))
+            fingerprints.append(digest.hexdigest())
+    return fingerprints
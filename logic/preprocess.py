@@ -0,0 +1,191 @@
+import logging
+import math
+from typing import Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Height in pixels (ascender to descender) that text lines are rescaled to.
+# Tuned with benchmarks/bench_ocr_preprocess.py: taller costs OCR time
+# without improving accuracy, much shorter loses characters.
+TARGET_LINE_HEIGHT = 20
+MIN_SCALE = 0.25
+MAX_SCALE = 4.0
+# Rescaling by less than this is not worth the resample.
+SCALE_TOLERANCE = 0.2
+# Never hand Tesseract more than this many pixels, whatever the estimate says.
+MAX_OCR_PIXELS = 24_000_000
+MAX_SKEW_DEGREES = 5.0
+SKEW_STEP_DEGREES = 0.25
+# Skew below this is left alone; rotating costs more than it helps.
+MIN_DESKEW_DEGREES = 0.3
+# Rows where more than this fraction of pixels is "ink" are solid bars (title
+# bars, buttons, table headers) and are inverted so their text is dark on light.
+SOLID_ROW_FRACTION = 0.6
+CROP_MARGIN = 10
+MAX_SKEW_SAMPLES = 50_000
+
+
+def to_grayscale(image: Image.Image) -> np.ndarray:
+    """Return an 8-bit grayscale array, flattening any transparency onto white."""
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+    if image.mode != "L":
+        image = image.convert("L")
+    return np.asarray(image, dtype=np.uint8)
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Global Otsu threshold of an 8-bit image."""
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = histogram.sum()
+    if total == 0:
+        return 128
+    levels = np.arange(256, dtype=np.float64)
+    weight_dark = np.cumsum(histogram)
+    weight_light = total - weight_dark
+    sum_dark = np.cumsum(histogram * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+    between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(between))
+
+
+def normalize_polarity(gray: np.ndarray, threshold: int) -> np.ndarray:
+    """Invert dark-mode images so text is dark on a light background."""
+    if (gray <= threshold).mean() > 0.5:
+        return 255 - gray
+    return gray
+
+
+def invert_solid_rows(gray: np.ndarray, threshold: int) -> np.ndarray:
+    """Invert rows that are mostly ink (dark title bars, buttons) so their text reads dark on light."""
+    solid_rows = (gray <= threshold).mean(axis=1) > SOLID_ROW_FRACTION
+    if not solid_rows.any():
+        return gray
+    gray = gray.copy()
+    rows = gray[solid_rows]
+    # The bar itself becomes white background; its light text becomes dark.
+    gray[solid_rows] = np.where(rows <= threshold, 255, 255 - rows)
+    return gray
+
+
+def estimate_skew(ink: np.ndarray) -> float:
+    """
+    Estimate text skew in degrees with a projection profile.
+
+    Ink pixels are projected onto the vertical axis at every candidate angle at
+    once; the angle whose profile has the sharpest row-to-row changes (text
+    lines start and stop crisply) wins. Using the profile gradient rather than
+    its peaks keeps solid bars and images from dominating. Positive means the
+    text rises to the right.
+    """
+    ys, xs = np.nonzero(ink)
+    if len(ys) < 100:
+        return 0.0
+    if len(ys) > MAX_SKEW_SAMPLES:
+        pick = np.random.default_rng(0).choice(len(ys), MAX_SKEW_SAMPLES, replace=False)
+        ys, xs = ys[pick], xs[pick]
+    angles = np.arange(-MAX_SKEW_DEGREES, MAX_SKEW_DEGREES + SKEW_STEP_DEGREES / 2, SKEW_STEP_DEGREES)
+    radians = np.deg2rad(angles)[:, None]
+    projected = ys[None, :] * np.cos(radians) + xs[None, :] * np.sin(radians)
+    rows = np.floor(projected).astype(np.int64)
+    rows -= rows.min()
+    height = int(rows.max()) + 1
+    # One bincount over all angles: offset each angle's rows into its own block.
+    offsets = np.arange(len(angles), dtype=np.int64)[:, None] * height
+    profiles = np.bincount((rows + offsets).ravel(), minlength=len(angles) * height)
+    profiles = profiles.reshape(len(angles), height).astype(np.float64)
+    scores = np.square(np.diff(profiles, axis=1)).sum(axis=1)
+    return float(angles[int(np.argmax(scores))])
+
+
+def ink_bounding_box(ink: np.ndarray, margin: int = CROP_MARGIN):
+    """(left, top, right, bottom) around all ink plus `margin`, or None for a blank image."""
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if len(rows) == 0 or len(cols) == 0:
+        return None
+    height, width = ink.shape
+    return (
+        max(0, int(cols[0]) - margin),
+        max(0, int(rows[0]) - margin),
+        min(width, int(cols[-1]) + 1 + margin),
+        min(height, int(rows[-1]) + 1 + margin),
+    )
+
+
+def estimate_line_height(ink: np.ndarray) -> float:
+    """Median height in pixels of the horizontal bands that contain ink (0 when unknown)."""
+    inked_rows = ink.mean(axis=1) > 0.002
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], inked_rows.astype(np.int8), [0]))))
+    heights = edges[1::2] - edges[0::2]
+    heights = heights[heights >= 3]  # rules, underlines and specks
+    # One band covering most of the image means lines touch; no usable estimate.
+    if len(heights) < 2 and (len(heights) == 0 or heights[0] > 0.5 * len(inked_rows)):
+        return 0.0
+    return float(np.median(heights))
+
+
+def choose_scale(line_height: float, size: Tuple[int, int]) -> float:
+    """Resize factor that brings text to TARGET_LINE_HEIGHT, within the pixel budget."""
+    scale = TARGET_LINE_HEIGHT / line_height if line_height else 1.0
+    scale = min(MAX_SCALE, max(MIN_SCALE, scale))
+    width, height = size
+    max_scale = math.sqrt(MAX_OCR_PIXELS / max(1, width * height))
+    scale = min(scale, max_scale)
+    if abs(scale - 1.0) < SCALE_TOLERANCE:
+        return 1.0
+    return scale
+
+
+def preprocess_for_ocr(image: Image.Image, binarize: bool = True) -> Image.Image:
+    """
+    Prepare an image for Tesseract.
+
+    Converts to grayscale, makes text dark on light, deskews, crops to the
+    text, rescales so text lines are about TARGET_LINE_HEIGHT pixels tall
+    (shrinking 4K screenshots, enlarging thumbnails) and optionally binarizes
+    with Otsu's threshold.
+
+    Returns:
+        A mode "L" PIL image.
+    """
+    gray = to_grayscale(image)
+    threshold = otsu_threshold(gray)
+    gray = normalize_polarity(gray, threshold)
+
+    angle = estimate_skew(gray <= threshold)
+    if abs(angle) >= MIN_DESKEW_DEGREES:
+        # PIL rotates counter-clockwise; text rising to the right needs a clockwise turn.
+        rotated = Image.fromarray(gray).rotate(-angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+        gray = np.asarray(rotated, dtype=np.uint8)
+    gray = invert_solid_rows(gray, threshold)
+    ink = gray <= threshold
+
+    box = ink_bounding_box(ink)
+    if box is None:
+        return Image.fromarray(gray)
+    left, top, right, bottom = box
+    gray = gray[top:bottom, left:right]
+    ink = ink[top:bottom, left:right]
+
+    line_height = estimate_line_height(ink)
+    result = Image.fromarray(gray)
+    scale = choose_scale(line_height, result.size)
+    if scale != 1.0:
+        size = (max(1, round(result.width * scale)), max(1, round(result.height * scale)))
+        result = result.resize(size, Image.LANCZOS if scale < 1 else Image.BICUBIC)
+    if binarize:
+        resized = np.asarray(result, dtype=np.uint8)
+        result = Image.fromarray(np.where(resized > otsu_threshold(resized), 255, 0).astype(np.uint8))
+
+    logger.debug(
+        f"OCR preprocess: skew {angle:.2f} deg, line height {line_height:.0f}px, "
+        f"scale {scale:.2f}, {image.size} -> {result.size}"
+    )
+    return result
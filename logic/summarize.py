@@ -0,0 +1,149 @@
+import asyncio
+import collections
+import logging
+import os
+import time
+from typing import List, Optional
+
+from logic.cache import get_llm_cache
+from logic.chunking import count_tokens, split_into_chunks
+from logic.llm import ANALYSIS_TIMEOUT_SECONDS, _acomplete
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MODEL = "llama3-8b-8192"
+MODEL_CONTEXT_TOKENS = 8192
+# Room left in the context window for the instructions and the model's answer.
+PROMPT_OVERHEAD_TOKENS = 200
+PART_SUMMARY_TOKENS = 300
+FINAL_SUMMARY_TOKENS = 150
+# Tokens of document text per map request.
+CHUNK_TOKENS = int(os.getenv(
+    "SUMMARY_CHUNK_TOKENS", str(MODEL_CONTEXT_TOKENS - PROMPT_OVERHEAD_TOKENS - PART_SUMMARY_TOKENS)
+))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", "4"))
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+
+SYSTEM_PROMPT = "You are a helpful assistant that summarizes text concisely."
+# No part numbers in the prompts: a chunk's request (and so its cache key)
+# depends only on its text, so unchanged chunks are served from the cache.
+PART_PROMPT = "Summarize the key points and relevant details of this excerpt from a longer document:\n{text}\n"
+COMBINE_PROMPT = (
+    "These are summaries of consecutive parts of one document. Combine them into a single summary of "
+    "the key points and relevant details:\n{text}\n"
+)
+FINAL_PROMPT = "Summarize the following text for key points and relevant details:\n{text}\n"
+
+
+class RateLimiter:
+    """
+    Async limit on API requests: at most `max_concurrent` in flight, and at
+    most `requests_per_minute` started in any 60 seconds.
+
+    Requests within the per-minute quota start right away rather than being
+    spaced out, so a document of a few chunks is summarized in about the time
+    of its slowest requests.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 requests_per_minute: float = REQUESTS_PER_MINUTE):
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._per_minute = max(1, int(requests_per_minute)) if requests_per_minute > 0 else None
+        self._starts = collections.deque()
+        self._lock = asyncio.Lock()
+
+    async def _wait_for_quota(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._starts and now - self._starts[0] >= 60:
+                    self._starts.popleft()
+                if len(self._starts) < self._per_minute:
+                    self._starts.append(now)
+                    return
+                await asyncio.sleep(60 - (now - self._starts[0]))
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            if self._per_minute is not None:
+                await self._wait_for_quota()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+
+def fits_in_one_request(text: str) -> bool:
+    return count_tokens(text) <= CHUNK_TOKENS
+
+
+async def _summarize_parts(client, parts: List[str], prompt: str, limiter: RateLimiter) -> List[str]:
+    # Part summaries are deterministic and always memoized, so after an edit only changed parts are sent.
+    return await asyncio.gather(*(
+        _acomplete(
+            client, SUMMARY_MODEL, SYSTEM_PROMPT, prompt.format(text=part),
+            max_tokens=PART_SUMMARY_TOKENS, temperature=0.0, cache=True, limiter=limiter,
+        )
+        for part in parts
+    ))
+
+
+def _group(summaries: List[str], max_tokens: int) -> List[str]:
+    """Pack consecutive summaries into groups that each fit in one request."""
+    groups, current, current_tokens = [], [], 0
+    for summary in summaries:
+        tokens = count_tokens(summary) + 1
+        if current and current_tokens + tokens > max_tokens:
+            groups.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        groups.append("\n\n".join(current))
+    return groups
+
+
+async def map_reduce_summary(client, text: str, limiter: Optional[RateLimiter] = None) -> str:
+    """
+    Summarize text too long for one request.
+
+    The text is split on section and paragraph boundaries into chunks that fit
+    the model's window (see `logic.chunking`). The chunks are summarized
+    concurrently under `limiter`. The part summaries are then combined group by
+    group, level after level, until they fit in one final request, which uses
+    the same settings as a short document's summary.
+    """
+    limiter = limiter or RateLimiter()
+    cache = get_llm_cache()
+    hits_before = cache.hits
+    started = time.perf_counter()
+
+    chunks = split_into_chunks(text, CHUNK_TOKENS)
+    if REQUESTS_PER_MINUTE > 0 and len(chunks) + 1 > REQUESTS_PER_MINUTE * ANALYSIS_TIMEOUT_SECONDS / 60:
+        logger.warning(
+            f"Summarizing {len(chunks)} chunks needs more requests than LLM_REQUESTS_PER_MINUTE="
+            f"{REQUESTS_PER_MINUTE:g} allows in the {ANALYSIS_TIMEOUT_SECONDS:g}s analysis budget; "
+            "parts finished in time are cached for the next run"
+        )
+    summaries = await _summarize_parts(client, chunks, PART_PROMPT, limiter)
+    levels = 0
+    while len(summaries) > 1 and count_tokens("\n\n".join(summaries)) > CHUNK_TOKENS:
+        groups = _group(summaries, CHUNK_TOKENS)
+        if len(groups) == len(summaries):
+            break  # each summary fills a request on its own (tiny SUMMARY_CHUNK_TOKENS); combining won't shrink them
+        summaries = await _summarize_parts(client, groups, COMBINE_PROMPT, limiter)
+        levels += 1
+
+    summary = await _acomplete(
+        client, SUMMARY_MODEL, SYSTEM_PROMPT, FINAL_PROMPT.format(text="\n\n".join(summaries)),
+        max_tokens=FINAL_SUMMARY_TOKENS, temperature=0.7, limiter=limiter,
+    )
+    logger.info(
+        f"Map-reduce summary of {len(chunks)} chunk(s) with {levels} combine level(s) in "
+        f"{time.perf_counter() - started:.1f}s ({cache.hits - hits_before} part summaries from cache)"
+    )
+    return summary
@@ -0,0 +1,170 @@
+import codecs
+import logging
+import mmap
+import os
+from pathlib import Path
+from typing import Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bytes sampled from the start of the file to pick an encoding.
+SAMPLE_BYTES = 64 * 1024
+CHUNK_BYTES = 1024 * 1024
+# Used for the rest of the file when bytes stop being valid in the detected
+# encoding; latin-1 decodes any byte, which is what the old reader fell back to.
+FALLBACK_ENCODING = "latin-1"
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+def detect_encoding(sample: bytes) -> Tuple[str, int]:
+    """
+    Pick an encoding from the first bytes of a file.
+
+    Returns:
+        (encoding, number of BOM bytes to skip)
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding, len(bom)
+    try:
+        # final=False: the sample may end in the middle of a multi-byte character.
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8", 0
+    except UnicodeDecodeError:
+        pass
+    try:
+        from charset_normalizer import from_bytes
+
+        best = from_bytes(sample).best()
+        if best is not None:
+            return codecs.lookup(best.encoding).name, 0
+    except ImportError:
+        pass
+    return FALLBACK_ENCODING, 0
+
+
+def _release(mm: mmap.mmap, start: int, stop: int):
+    """Drop already-decoded pages from this process's RSS (they stay in the page cache)."""
+    if not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    start -= start % mmap.PAGESIZE
+    stop -= stop % mmap.PAGESIZE
+    if stop > start:
+        mm.madvise(mmap.MADV_DONTNEED, start, stop - start)
+
+
+def iter_decoded_chunks(file_path: Path, chunk_bytes: int = CHUNK_BYTES) -> Iterator[str]:
+    """
+    Decode a file in one pass over a memory map, yielding text chunks of about `chunk_bytes`.
+
+    Line endings are translated like text-mode `open()` does ("\\r\\n" and
+    "\\r" become "\\n"). If the bytes stop being valid in the detected encoding
+    part-way through, decoding continues from that byte with FALLBACK_ENCODING
+    instead of starting again.
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            encoding, position = detect_encoding(mm[:SAMPLE_BYTES])
+            logger.info(f"Decoding {file_path} as {encoding}")
+            decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+            # A "\r" ending a chunk is held back in case the next chunk starts with its "\n".
+            carried_cr = ""
+            while position < size:
+                pending = decoder.getstate()[0]
+                chunk = mm[position:position + chunk_bytes]
+                final = position + len(chunk) >= size
+                try:
+                    text = decoder.decode(chunk, final=final)
+                except UnicodeDecodeError as e:
+                    if encoding == FALLBACK_ENCODING:
+                        raise
+                    # Everything before the bad byte is valid; decode the rest with the fallback.
+                    data = pending + chunk
+                    text = data[:e.start].decode(encoding)
+                    bad_position = position - len(pending) + e.start
+                    logger.warning(
+                        f"{file_path} is not valid {encoding} from byte {bad_position}; "
+                        f"decoding the rest as {FALLBACK_ENCODING}"
+                    )
+                    encoding = FALLBACK_ENCODING
+                    decoder = codecs.getincrementaldecoder(encoding)()
+                    chunk_stop = bad_position
+                else:
+                    chunk_stop = position + len(chunk)
+                text = carried_cr + text
+                carried_cr = ""
+                if text.endswith("\r"):
+                    text, carried_cr = text[:-1], "\r"
+                if text:
+                    yield text.replace("\r\n", "\n").replace("\r", "\n")
+                _release(mm, position, chunk_stop)
+                position = chunk_stop
+                del chunk
+            if carried_cr:
+                yield "\n"
+
+
+def iter_text_pieces(file_path: Path, chunk_bytes: int = CHUNK_BYTES) -> Iterator[str]:
+    """
+    Yield a text file's contents in line-aligned pieces.
+
+    `"\\n".join(pieces)` equals the whole file's text with leading and trailing
+    whitespace stripped, so the pieces can be streamed as segments and joined
+    like any other extractor's output. Only about one chunk is held at a time:
+    a line longer than a chunk is broken at its last space or tab, which the
+    join turns into a newline, or at the chunk size if it has none.
+    """
+    buffer = ""
+    held = None
+    started = False
+
+    decoded = iter_decoded_chunks(file_path, chunk_bytes)
+    while True:
+        text = next(decoded, None)
+        flush = text is None
+        if not flush:
+            buffer += text
+        if flush:
+            pieces, buffer = [buffer], ""
+        elif len(buffer) >= chunk_bytes:
+            cut = buffer.rfind("\n")
+            if cut < 0:
+                cut = max(buffer.rfind(" "), buffer.rfind("\t"))
+            if cut < 0:
+                pieces, buffer = [buffer[:chunk_bytes]], buffer[chunk_bytes:]
+            else:
+                pieces, buffer = [buffer[:cut]], buffer[cut + 1:]
+        else:
+            pieces = []
+        for piece in pieces:
+            if not started:
+                piece = piece.lstrip()
+                if not piece:
+                    continue
+                started = True
+            if held is None:
+                held = piece
+            elif not piece.strip():
+                # Whitespace-only pieces stay with the previous one so trailing whitespace strips cleanly.
+                held = f"{held}\n{piece}"
+            else:
+                yield held
+                held = piece
+        if flush:
+            break
+    if held is not None:
+        held = held.rstrip()
+        if held:
+            yield held
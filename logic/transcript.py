@@ -0,0 +1,218 @@
+import io
+import logging
+import math
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from logic.cache import atomic_write, get_transcript_cache
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_VERSION = 1
+# Formats whose extraction is a Whisper transcription.
+TRANSCRIBED_EXTENSIONS = {".mp3", ".wav", ".mp4"}
+
+
+class Transcript:
+    """
+    Timestamped transcript segments held in flat NumPy arrays.
+
+    Segment `i` is `(start, end, text, confidence)`: times in seconds on the
+    recording's timeline and Whisper's confidence in [0, 1] (NaN when unknown).
+    Times and confidences are float32 arrays, and the texts are one UTF-8
+    buffer sliced by `offsets`, so an hour-long recording costs a few hundred
+    KB and loads without any per-segment Python objects.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, confidences: np.ndarray,
+                 text_bytes: np.ndarray, offsets: np.ndarray):
+        self.starts = starts
+        self.ends = ends
+        self.confidences = confidences
+        self.text_bytes = text_bytes
+        self.offsets = offsets
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[dict]) -> "Transcript":
+        """Build a transcript from Whisper-style segment dicts (`start`, `end`, `text`, optional `confidence`)."""
+        starts, ends, confidences, encoded = [], [], [], []
+        for segment in segments:
+            starts.append(segment["start"])
+            ends.append(segment["end"])
+            confidences.append(segment.get("confidence", math.nan))
+            encoded.append(segment["text"].strip().encode("utf-8"))
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in encoded], out=offsets[1:])
+        return cls(
+            np.asarray(starts, dtype=np.float32),
+            np.asarray(ends, dtype=np.float32),
+            np.asarray(confidences, dtype=np.float32),
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            offsets,
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _text(self, i: int) -> str:
+        return self.text_bytes[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __getitem__(self, i: int) -> Tuple[float, float, str, float]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("transcript segment index out of range")
+        return float(self.starts[i]), float(self.ends[i]), self._text(i), float(self.confidences[i])
+
+    def __iter__(self) -> Iterator[Tuple[float, float, str, float]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return f"Transcript(segments={len(self)}, duration={self.duration:.1f}s)"
+
+    @property
+    def duration(self) -> float:
+        return float(self.ends[-1]) if len(self) else 0.0
+
+    @property
+    def text(self) -> str:
+        return " ".join(text for text in (self._text(i) for i in range(len(self))) if text)
+
+    def _slice(self, first: int, stop: int) -> "Transcript":
+        """Segments `first:stop` as views of this transcript's arrays."""
+        stop = max(first, stop)
+        offsets = self.offsets[first:stop + 1]
+        return Transcript(
+            self.starts[first:stop], self.ends[first:stop], self.confidences[first:stop],
+            self.text_bytes[offsets[0]:offsets[-1]], offsets - offsets[0],
+        )
+
+    def _take(self, indices: np.ndarray) -> "Transcript":
+        return Transcript.from_segments(
+            {"start": self.starts[i], "end": self.ends[i], "text": self._text(i), "confidence": self.confidences[i]}
+            for i in indices
+        )
+
+    def index_at(self, seconds: float) -> int:
+        """Index of the segment playing at `seconds` (or the next one to start); `len(self)` past the end."""
+        return int(np.searchsorted(self.ends, seconds, side="right"))
+
+    def between(self, start: float, end: float) -> "Transcript":
+        """The segments that overlap `[start, end)` seconds."""
+        first = self.index_at(start)
+        stop = int(np.searchsorted(self.starts, end, side="left"))
+        return self._slice(first, stop)
+
+    def rechunk(self, max_seconds: float) -> List["Transcript"]:
+        """
+        Group consecutive segments into windows spanning at most `max_seconds` each.
+
+        Segments are never split, so a single segment longer than `max_seconds`
+        gets a window of its own.
+        """
+        windows = []
+        first = 0
+        while first < len(self):
+            stop = int(np.searchsorted(self.ends, self.starts[first] + max_seconds, side="right"))
+            stop = max(stop, first + 1)
+            windows.append(self._slice(first, stop))
+            first = stop
+        return windows
+
+    def low_confidence(self, threshold: float = 0.5) -> "Transcript":
+        """Segments Whisper was unsure about, e.g. to review or re-transcribe."""
+        return self._take(np.flatnonzero(self.confidences < threshold))
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            version=np.array(TRANSCRIPT_VERSION),
+            starts=self.starts,
+            ends=self.ends,
+            confidences=self.confidences,
+            text_bytes=self.text_bytes,
+            offsets=self.offsets,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Transcript":
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            if int(arrays["version"]) != TRANSCRIPT_VERSION:
+                raise ValueError(f"Unsupported transcript version: {int(arrays['version'])}")
+            return cls(arrays["starts"], arrays["ends"], arrays["confidences"], arrays["text_bytes"], arrays["offsets"])
+
+    def save(self, path: Path):
+        atomic_write(Path(path), self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Path) -> "Transcript":
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+def _transcript_key(file_path: Path) -> str:
+    from logic.extraction import extraction_cache_key
+
+    # Same key as the extracted text, so the two always describe the same transcription.
+    return extraction_cache_key(Path(file_path))
+
+
+def store_transcript(file_path: Path, segments: Iterable, key: str):
+    """
+    Store the timestamped transcript of a recording that was just extracted in full.
+
+    Args:
+        file_path: The recording (only its name is recorded).
+        segments: Its extracted `Segment`s; those without `timestamps` (other formats) are ignored.
+        key: The recording's extraction cache key, which the caller has already computed.
+    """
+    file_path = Path(file_path)
+    timestamped = [t for segment in segments if segment.timestamps for t in segment.timestamps]
+    if not timestamped:
+        return
+    try:
+        transcript = Transcript.from_segments(timestamped)
+        get_transcript_cache().set(key, transcript.to_bytes(), source=file_path.name)
+        logger.info(f"Stored transcript of {file_path.name}: {len(transcript)} segment(s)")
+    except Exception as e:
+        logger.warning(f"Could not store transcript for {file_path.name}: {str(e)}")
+
+
+def load_transcript(file_path: Path) -> Optional[Transcript]:
+    """The stored transcript of a recording, or None if it hasn't been transcribed (or was evicted)."""
+    file_path = Path(file_path)
+    if file_path.suffix.lower() not in TRANSCRIBED_EXTENSIONS:
+        return None
+    data = get_transcript_cache().get(_transcript_key(file_path))
+    if data is None:
+        return None
+    try:
+        return Transcript.from_bytes(data)
+    except (ValueError, KeyError, OSError):
+        return None
+
+
+def transcript_path(text_path: Path) -> Path:
+    """Where the transcript of `<name>.txt` lives: `<name>.transcript.npz` in the same folder."""
+    text_path = Path(text_path)
+    return text_path.with_name(f"{text_path.stem}.transcript.npz")
+
+
+def save_transcript_beside(file_path: Path, text_path: Path) -> Optional[Path]:
+    """
+    Copy a recording's stored transcript next to its extracted text file.
+
+    Returns:
+        The transcript path, or None when `file_path` is not a recording or has no stored transcript.
+    """
+    transcript = load_transcript(file_path)
+    if transcript is None:
+        return None
+    path = transcript_path(text_path)
+    transcript.save(path)
+    logger.info(f"Transcript saved to {path}")
+    return path
@@ -0,0 +1,297 @@
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from logic.audio import SAMPLE_RATE, iter_audio_chunks
+from logic.vad import compact_speech, detect_speech
+from logic.whisper_pool import get_whisper_pool
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SECONDS = 60
+OVERLAP_SECONDS = 2.0
+# Skip silence and music with an energy-based voice-activity pre-pass before Whisper.
+VAD_ENABLED = os.getenv("TRANSCRIPTION_VAD", "0").lower() in ("1", "true", "yes")
+
+# Rough peak working set of one worker process holding the model, in MB.
+_WORKER_MEMORY_MB = {"tiny": 600, "base": 900, "small": 1800, "medium": 4500, "large": 9000}
+
+
+def _available_memory_mb() -> Optional[int]:
+    """Best-effort available system memory in MB (None when unknown)."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_worker_count(model_name: str = "base") -> int:
+    """Size the worker pool to the available cores and memory."""
+    configured = os.getenv("TRANSCRIPTION_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    workers = os.cpu_count() or 1
+    available = _available_memory_mb()
+    if available is not None:
+        per_worker = _WORKER_MEMORY_MB.get(model_name.split(".")[0], _WORKER_MEMORY_MB["base"])
+        workers = min(workers, max(1, available // per_worker))
+    return max(1, workers)
+
+
+_WORD_RE = re.compile(r"[^\w']+")
+
+
+def _normalize_word(word: str) -> str:
+    return _WORD_RE.sub("", word.lower())
+
+
+def merge_overlapping_text(previous: str, current: str, max_overlap_words: int = 20) -> str:
+    """
+    Drop the words at the start of `current` that repeat the end of `previous`.
+
+    Consecutive chunks share `OVERLAP_SECONDS` of audio, so the same words are
+    usually transcribed twice around each cut. The longest run of words that
+    ends `previous` and starts `current` is treated as the duplicate.
+    """
+    prev_words = previous.split()
+    cur_words = current.split()
+    if not prev_words or not cur_words:
+        return current
+    prev_norm = [_normalize_word(w) for w in prev_words[-max_overlap_words:]]
+    cur_norm = [_normalize_word(w) for w in cur_words[:max_overlap_words]]
+    for size in range(min(len(prev_norm), len(cur_norm)), 0, -1):
+        if prev_norm[-size:] == cur_norm[:size]:
+            return " ".join(cur_words[size:])
+    return current
+
+
+def segment_confidence(segment: dict) -> float:
+    """Whisper's mean token probability for a segment, in [0, 1] (NaN when not reported)."""
+    avg_logprob = segment.get("avg_logprob")
+    if avg_logprob is None:
+        return float("nan")
+    return float(min(1.0, max(0.0, np.exp(avg_logprob))))
+
+
+def _transcribe_samples(model_name: str, samples: np.ndarray) -> dict:
+    with get_whisper_pool().using(model_name) as model:
+        return model.transcribe(samples)
+
+
+def _init_worker(model_name: str, torch_threads: int):
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    # Load once at start-up so every chunk this worker receives hits a warm model.
+    get_whisper_pool().get(model_name)
+
+
+def _transcribe_speech_only(model_name: str, samples: np.ndarray) -> dict:
+    """Transcribe only the regions VAD marks as speech, with timestamps on the chunk's own timeline."""
+    regions = detect_speech(samples)
+    if not regions:
+        return {"text": "", "segments": []}
+    speech, timeline = compact_speech(samples, regions)
+    result = _transcribe_samples(model_name, speech)
+    segments = []
+    for segment in result.get("segments", []):
+        segment = dict(segment)
+        segment["start"] = timeline.to_original(float(segment["start"]))
+        segment["end"] = timeline.to_original(float(segment["end"]))
+        segments.append(segment)
+    return {"text": result.get("text", ""), "segments": segments}
+
+
+def _transcribe_chunk(
+    model_name: str, index: int, start: float, samples: np.ndarray, vad: bool = False
+) -> Tuple[int, float, float, dict]:
+    if vad:
+        result = _transcribe_speech_only(model_name, samples)
+    else:
+        result = _transcribe_samples(model_name, samples)
+    duration = len(samples) / SAMPLE_RATE
+    return index, start, duration, {"text": result.get("text", ""), "segments": result.get("segments", [])}
+
+
+class ChunkTranscript:
+    """Transcript of one audio chunk, with the overlap shared with the previous chunk removed."""
+
+    def __init__(self, index: int, start: float, end: float, text: str, segments: List[dict]):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+        self.segments = segments
+
+
+class TranscriptionResult:
+    def __init__(self, text: str, segments: List[dict]):
+        self.text = text
+        self.segments = segments
+
+
+class TranscriptionScheduler:
+    """
+    Spread audio chunks across a pool of warm Whisper worker processes.
+
+    Chunks are submitted as they are decoded, with a bounded number in flight,
+    and reassembled in order with the overlap at each cut removed.
+    """
+
+    def __init__(self, model_name: str = "base", max_workers: Optional[int] = None, vad: Optional[bool] = None):
+        self.model_name = model_name
+        self.max_workers = max_workers or default_worker_count(model_name)
+        self.vad = VAD_ENABLED if vad is None else vad
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                torch_threads = max(1, (os.cpu_count() or 1) // self.max_workers)
+                logger.info(
+                    f"Starting {self.max_workers} Whisper worker(s) "
+                    f"({torch_threads} torch thread(s) each) for model '{self.model_name}'"
+                )
+                # Spawn rather than fork: forking a process that already holds torch
+                # state is unsafe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, torch_threads),
+                )
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                # `_run_parallel` has already cancelled the chunks it queued.
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def iter_transcribe_chunks(
+        self, chunks: Iterable[Tuple[float, np.ndarray]], overlap_seconds: float = 0.0
+    ) -> Iterator[ChunkTranscript]:
+        """
+        Transcribe `(start_seconds, samples)` chunks, yielding each one in order as soon as it is ready.
+
+        `overlap_seconds` is how much audio each chunk shares with the previous one;
+        words and segments repeated across that overlap are dropped.
+        """
+        previous_text = ""
+        for index, start, duration, result in self._iter_raw_results(chunks):
+            chunk_text = result["text"].strip()
+            if index and chunk_text:
+                chunk_text = merge_overlapping_text(previous_text, chunk_text)
+            if chunk_text:
+                previous_text = chunk_text
+            segments = []
+            for segment in result["segments"]:
+                if index and float(segment["end"]) <= overlap_seconds:
+                    continue  # already covered by the previous chunk
+                segments.append({
+                    "start": float(segment["start"]) + start,
+                    "end": float(segment["end"]) + start,
+                    "text": segment["text"].strip(),
+                    "confidence": segment_confidence(segment),
+                })
+            chunk_start = start + overlap_seconds if index else start
+            yield ChunkTranscript(index, chunk_start, start + duration, chunk_text, segments)
+
+    def transcribe_chunks(
+        self, chunks: Iterable[Tuple[float, np.ndarray]], overlap_seconds: float = 0.0
+    ) -> TranscriptionResult:
+        """Transcribe `(start_seconds, samples)` chunks and join the text in order."""
+        texts = []
+        segments = []
+        for chunk in self.iter_transcribe_chunks(chunks, overlap_seconds):
+            if chunk.text:
+                texts.append(chunk.text)
+            segments.extend(chunk.segments)
+        return TranscriptionResult(" ".join(texts), segments)
+
+    def _iter_raw_results(self, chunks: Iterable[Tuple[float, np.ndarray]]) -> Iterator[Tuple[int, float, float, dict]]:
+        chunk_iter = iter(chunks)
+        first = next(chunk_iter, None)
+        if first is None:
+            return
+        second = next(chunk_iter, None)
+
+        if second is None or self.max_workers == 1:
+            # Not worth a round-trip through the pool: transcribe in this process.
+            for index, (start, samples) in enumerate(_chain(first, second, chunk_iter)):
+                yield _transcribe_chunk(self.model_name, index, start, samples, self.vad)
+            return
+
+        try:
+            yield from self._run_parallel(_chain(first, second, chunk_iter))
+        except BrokenProcessPool:
+            # A worker died (usually OOM); drop the pool so the next call starts fresh.
+            self.shutdown()
+            raise
+
+    def _run_parallel(self, chunks: Iterable[Tuple[float, np.ndarray]]) -> Iterator[Tuple[int, float, float, dict]]:
+        executor = self._get_executor()
+        max_in_flight = self.max_workers * 2
+        pending = deque()
+        try:
+            for index, (start, samples) in enumerate(chunks):
+                pending.append(executor.submit(_transcribe_chunk, self.model_name, index, start, samples, self.vad))
+                while len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _chain(first, second, rest):
+    yield first
+    if second is not None:
+        yield second
+    yield from rest
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_transcription_scheduler(model_name: str = "base") -> TranscriptionScheduler:
+    """Return the process-wide scheduler for `model_name`, keeping its workers warm."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(model_name)
+        if scheduler is None:
+            scheduler = _schedulers[model_name] = TranscriptionScheduler(model_name)
+        return scheduler
+
+
+def iter_transcribe_file(file_path: Path, model_name: str = "base") -> Iterator[ChunkTranscript]:
+    """Decode `file_path` in one ffmpeg pass and yield chunk transcripts in order as they complete."""
+    chunks = iter_audio_chunks(file_path, chunk_seconds=CHUNK_SECONDS, overlap_seconds=OVERLAP_SECONDS)
+    return get_transcription_scheduler(model_name).iter_transcribe_chunks(chunks, overlap_seconds=OVERLAP_SECONDS)
+
+
+def transcribe_file(file_path: Path, model_name: str = "base") -> TranscriptionResult:
+    """Decode `file_path` in one ffmpeg pass and transcribe its chunks in parallel."""
+    chunks = iter_audio_chunks(file_path, chunk_seconds=CHUNK_SECONDS, overlap_seconds=OVERLAP_SECONDS)
+    return get_transcription_scheduler(model_name).transcribe_chunks(chunks, overlap_seconds=OVERLAP_SECONDS)
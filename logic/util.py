@@ -23,7 +23,8 @@ def setup_storage():
         "ProjectStorage/extracted",
         "ProjectStorage/reports",
         "ProjectStorage/logs",
-        "ProjectStorage/screenshots"
+        "ProjectStorage/screenshots",
+        "ProjectStorage/cache"
     ]
     for dir_path in storage_dirs:
         full_path = Path(get_project_root()) / dir_path
@@ -0,0 +1,123 @@
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from logic.audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+FRAME_SECONDS = 0.03
+# Frames this far above the noise floor (in dB) count as speech.
+THRESHOLD_DB = 12.0
+# Anything quieter than this is silence no matter how quiet the recording is.
+MIN_SPEECH_DB = -50.0
+MIN_SPEECH_SECONDS = 0.25
+MIN_SILENCE_SECONDS = 0.6
+PAD_SECONDS = 0.2
+# Gap inserted between kept regions so Whisper doesn't run words together.
+JOIN_GAP_SECONDS = 0.2
+
+
+def frame_energy_db(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    """RMS energy of consecutive non-overlapping frames, in dBFS."""
+    frame_count = len(samples) // frame_size
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[: frame_count * frame_size].reshape(frame_count, frame_size)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def detect_speech(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """
+    Find speech regions with an adaptive energy threshold.
+
+    The noise floor is the 10th percentile of frame energy; frames sufficiently
+    above it are speech. Short gaps are bridged, short blips dropped and each
+    region padded so word edges are not clipped.
+
+    Returns:
+        Sorted, non-overlapping `(start_sample, end_sample)` pairs.
+    """
+    frame_size = max(1, int(FRAME_SECONDS * sample_rate))
+    energy = frame_energy_db(samples, frame_size)
+    if len(energy) == 0:
+        return []
+
+    noise_floor = float(np.percentile(energy, 10))
+    threshold = max(noise_floor + THRESHOLD_DB, MIN_SPEECH_DB)
+    voiced = energy > threshold
+    if not voiced.any():
+        return []
+
+    # Rising/falling edges of the voiced mask give region boundaries in frames.
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    starts, ends = edges[0::2], edges[1::2]
+
+    min_gap = int(MIN_SILENCE_SECONDS / FRAME_SECONDS)
+    min_len = int(MIN_SPEECH_SECONDS / FRAME_SECONDS)
+    pad = int(PAD_SECONDS * sample_rate)
+
+    regions = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    result = []
+    for start, end in regions:
+        if end - start < min_len:
+            continue
+        start_sample = max(0, start * frame_size - pad)
+        end_sample = min(len(samples), end * frame_size + pad)
+        if result and start_sample <= result[-1][1]:
+            result[-1] = (result[-1][0], end_sample)
+        else:
+            result.append((start_sample, end_sample))
+    return result
+
+
+class SpeechTimeline:
+    """Maps times in VAD-compacted audio back to the original timeline."""
+
+    def __init__(self, pieces: List[Tuple[int, int, int]], sample_rate: int = SAMPLE_RATE):
+        # (compact_start, original_start, length) in samples, sorted by compact_start.
+        self.pieces = pieces
+        self.sample_rate = sample_rate
+        self._compact_starts = np.array([p[0] for p in pieces], dtype=np.int64)
+
+    def to_original(self, seconds: float) -> float:
+        if not self.pieces:
+            return seconds
+        position = int(round(seconds * self.sample_rate))
+        i = max(0, int(np.searchsorted(self._compact_starts, position, side="right")) - 1)
+        compact_start, original_start, length = self.pieces[i]
+        offset = min(max(0, position - compact_start), length)
+        return (original_start + offset) / self.sample_rate
+
+
+def compact_speech(
+    samples: np.ndarray, regions: List[Tuple[int, int]], sample_rate: int = SAMPLE_RATE
+) -> Tuple[np.ndarray, SpeechTimeline]:
+    """Concatenate the speech regions (with a short gap between them) and return the timeline mapping."""
+    gap = np.zeros(int(JOIN_GAP_SECONDS * sample_rate), dtype=samples.dtype)
+    parts = []
+    pieces = []
+    position = 0
+    for start, end in regions:
+        if parts:
+            parts.append(gap)
+            position += len(gap)
+        parts.append(samples[start:end])
+        pieces.append((position, start, end - start))
+        position += end - start
+    compacted = np.concatenate(parts) if parts else np.zeros(0, dtype=samples.dtype)
+    return compacted, SpeechTimeline(pieces, sample_rate)
+
+
+def speech_ratio(samples: np.ndarray, regions: List[Tuple[int, int]]) -> float:
+    if len(samples) == 0:
+        return 0.0
+    return sum(end - start for start, end in regions) / len(samples)
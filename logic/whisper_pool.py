@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the combined parameter memory of all resident Whisper models.
+DEFAULT_MEMORY_BUDGET_MB = int(os.getenv("WHISPER_POOL_MEMORY_MB", "4096"))
+
+
+def _model_size_bytes(model) -> int:
+    """Approximate resident size of a Whisper model from its parameters and buffers."""
+    try:
+        size = sum(p.numel() * p.element_size() for p in model.parameters())
+        size += sum(b.numel() * b.element_size() for b in model.buffers())
+        return size
+    except Exception:
+        return 0
+
+
+class _PoolEntry:
+    def __init__(self, model, size_bytes: int):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.in_use = 0
+        self.last_used = time.monotonic()
+        # Whisper installs kv-cache hooks on the model while decoding, so two
+        # transcriptions must not run on the same instance at the same time.
+        self.lock = threading.Lock()
+
+
+class WhisperModelPool:
+    """
+    Process-wide registry of loaded Whisper models.
+
+    Each model size is loaded at most once per process and shared by every
+    caller (and therefore every Streamlit session served by this process).
+    Idle models are evicted least-recently-used first once the combined model
+    size exceeds the memory budget.
+    """
+
+    def __init__(self, memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB):
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._stats = {"loads": 0, "hits": 0, "misses": 0, "evictions": 0, "load_seconds": 0.0}
+
+    def _get_entry(self, name: str) -> _PoolEntry:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                self._stats["hits"] += 1
+                return entry
+            self._stats["misses"] += 1
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Load outside the pool lock so hits on other models are not blocked,
+        # but make sure concurrent misses on the same name only load once.
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    self._entries.move_to_end(name)
+                    return entry
+
+            import whisper
+
+            logger.info(f"Loading Whisper model '{name}'")
+            started = time.perf_counter()
+            model = whisper.load_model(name)
+            elapsed = time.perf_counter() - started
+            entry = _PoolEntry(model, _model_size_bytes(model))
+            logger.info(
+                f"Loaded Whisper model '{name}' in {elapsed:.2f}s "
+                f"({entry.size_bytes / (1024 * 1024):.0f} MB)"
+            )
+
+            with self._lock:
+                self._entries[name] = entry
+                self._stats["loads"] += 1
+                self._stats["load_seconds"] += elapsed
+                self._evict_locked(keep=name)
+            return entry
+
+    def _evict_locked(self, keep: str):
+        total = sum(e.size_bytes for e in self._entries.values())
+        for name in list(self._entries.keys()):
+            if total <= self.memory_budget_bytes:
+                break
+            entry = self._entries[name]
+            if name == keep or entry.in_use:
+                continue
+            del self._entries[name]
+            total -= entry.size_bytes
+            self._stats["evictions"] += 1
+            logger.info(f"Evicted idle Whisper model '{name}' to stay within memory budget")
+
+    def get(self, name: str = "base"):
+        """Return the shared model instance for `name`, loading it on first use."""
+        return self._get_entry(name).model
+
+    @contextmanager
+    def using(self, name: str = "base"):
+        """
+        Borrow a model for exclusive use (e.g. one `transcribe` call).
+
+        The model is pinned while borrowed so it cannot be evicted mid-use.
+        """
+        entry = self._get_entry(name)
+        with self._lock:
+            entry.in_use += 1
+        try:
+            with entry.lock:
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def stats(self) -> dict:
+        """Return load/hit/miss counters and the currently resident models."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["resident"] = {
+                name: round(entry.size_bytes / (1024 * 1024), 1)
+                for name, entry in self._entries.items()
+            }
+            stats["memory_budget_mb"] = self.memory_budget_bytes // (1024 * 1024)
+        return stats
+
+    def clear(self):
+        """Drop every idle model."""
+        with self._lock:
+            for name in [n for n, e in self._entries.items() if not e.in_use]:
+                del self._entries[name]
+
+
+_pool = WhisperModelPool()
+
+
+def get_whisper_pool() -> WhisperModelPool:
+    """Return the process-wide Whisper model pool."""
+    return _pool
+
+
+def get_whisper_model(name: str = "base"):
+    """Return a shared Whisper model, loading it once per process."""
+    return _pool.get(name)
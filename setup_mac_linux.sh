@@ -2,6 +2,26 @@
 
 echo "Setting up Automated QA Assistant for Mac/Linux..."
 
+echo
+echo "Installing system dependencies..."
+# Tesseract's headers and pkg-config are needed to build tesserocr (in-process OCR) during pip install.
+
+# Detect OS and install appropriate packages
+if [[ "$OSTYPE" == "darwin"* ]]; then
+    echo "Detected macOS. Installing dependencies with Homebrew..."
+    if ! command -v brew &> /dev/null; then
+        echo "Homebrew not found. Please install it first: https://brew.sh/"
+        exit 1
+    fi
+    brew install tesseract leptonica pkg-config ffmpeg
+elif [[ "$OSTYPE" == "linux-gnu"* ]]; then
+    echo "Detected Linux. Installing dependencies with apt..."
+    sudo apt-get update
+    sudo apt-get install -y tesseract-ocr libtesseract-dev libleptonica-dev pkg-config ffmpeg
+else
+    echo "Unsupported OS. Please install Tesseract OCR and FFmpeg manually."
+fi
+
 echo
 echo "Installing Python dependencies..."
 pip install -r requirements.txt
@@ -31,25 +51,6 @@ GROQ_API_KEY = "your_groq_api_key_here"
 EOF
 fi
 
-echo
-echo "Installing system dependencies..."
-
-# Detect OS and install appropriate packages
-if [[ "$OSTYPE" == "darwin"* ]]; then
-    echo "Detected macOS. Installing dependencies with Homebrew..."
-    if ! command -v brew &> /dev/null; then
-        echo "Homebrew not found. Please install it first: https://brew.sh/"
-        exit 1
-    fi
-    brew install tesseract ffmpeg
-elif [[ "$OSTYPE" == "linux-gnu"* ]]; then
-    echo "Detected Linux. Installing dependencies with apt..."
-    sudo apt-get update
-    sudo apt-get install -y tesseract-ocr ffmpeg
-else
-    echo "Unsupported OS. Please install Tesseract OCR and FFmpeg manually."
-fi
-
 echo
 echo "========================================"
 echo "Setup Complete!"
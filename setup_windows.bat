@@ -40,6 +40,7 @@ echo 2. Edit .streamlit\secrets.toml and add your API key
 echo 3. Install Tesseract OCR from: https://github.com/UB-Mannheim/tesseract/wiki
 echo 4. Install FFmpeg from: https://ffmpeg.org/download.html
 echo 5. Add Tesseract and FFmpeg to your system PATH
+echo    (OCR runs through the tesseract CLI on Windows; tesserocr is only installed on Mac/Linux)
 echo.
 echo To start the application:
 echo streamlit run ui/app.py
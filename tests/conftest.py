@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Run from anywhere: the app imports its modules as `logic.*` from the project root.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,16 @@
+import docx
+
+from logic.extraction import extract_text_from_docx
+
+
+def test_headers_come_before_footers(tmp_path):
+    document = docx.Document()
+    document.add_paragraph("Body text")
+    section = document.sections[0]
+    section.header.paragraphs[0].text = "Header text"
+    section.footer.paragraphs[0].text = "Footer text"
+    path = tmp_path / "spec.docx"
+    document.save(path)
+
+    text = extract_text_from_docx(path)
+    assert text.index("Body text") < text.index("Header text") < text.index("Footer text")
@@ -0,0 +1,30 @@
+import fitz
+
+from logic.pdf import page_text
+
+
+def _page(tmp_path, content: bytes):
+    """A one-page PDF whose content stream is `content`, drawn in Helvetica as /helv."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((0, 0), " ", fontname="helv")
+    doc.update_stream(page.get_contents()[0], content)
+    path = tmp_path / "page.pdf"
+    doc.save(path)
+    return fitz.open(path)[0]
+
+
+def test_table_cells_without_spaces_stay_apart(tmp_path):
+    # One text object, cells placed by moving the cursor rather than by spaces.
+    page = _page(tmp_path, b"BT /helv 10 Tf 50 700 Td (locked_out_user) Tj 80 0 Td (secret_sauce) Tj ET")
+    assert page_text(page) == "locked_out_user secret_sauce"
+
+
+def test_columns_on_one_baseline_stay_apart(tmp_path):
+    page = _page(tmp_path, b"BT /helv 10 Tf 50 600 Td (over the dog.) Tj 63 0 Td (right column) Tj ET")
+    assert page_text(page) == "over the dog. right column"
+
+
+def test_lines_are_ordered_top_to_bottom(tmp_path):
+    page = _page(tmp_path, b"BT /helv 10 Tf 50 500 Td (second line) Tj 0 200 Td (first line) Tj ET")
+    assert page_text(page) == "first line\nsecond line"
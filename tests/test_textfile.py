@@ -0,0 +1,23 @@
+from logic.textfile import iter_text_pieces
+
+
+def test_pieces_join_to_the_stripped_text(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"  first line\r\nsecond line\rthird line\n\n")
+    assert "\n".join(iter_text_pieces(path, chunk_bytes=16)) == "first line\nsecond line\nthird line"
+
+
+def test_line_longer_than_a_chunk_is_not_held_whole(tmp_path):
+    path = tmp_path / "one_line.txt"
+    path.write_text("word " * 1000, encoding="utf-8")
+    pieces = list(iter_text_pieces(path, chunk_bytes=64))
+    assert max(len(piece) for piece in pieces) <= 128
+    assert " ".join(pieces).split() == ["word"] * 1000
+
+
+def test_line_without_spaces_is_cut_at_the_chunk_size(tmp_path):
+    path = tmp_path / "blob.txt"
+    path.write_text("x" * 1000, encoding="utf-8")
+    pieces = list(iter_text_pieces(path, chunk_bytes=64))
+    assert max(len(piece) for piece in pieces) <= 128
+    assert "".join(pieces) == "x" * 1000
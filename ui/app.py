@@ -6,14 +6,18 @@ from pathlib import Path
 from datetime import datetime
 import subprocess
 import json
+import time
 from dotenv import load_dotenv
 
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from logic.extraction import extract_text_from_file
-from logic.llm import summarize_text, generate_test_cases, generate_automation_script
+from logic.daemon import connect_to_daemon
+from logic.extraction import join_segments
+from logic.incremental import extract_incremental, has_manifest, record_manifest
+from logic.limits import extract_with_limits
+from logic.llm import stream_analysis, stream_automation_script
 from logic.reporting import generate_pdf_report, generate_txt_report, generate_json_report
 from logic.util import setup_storage, get_project_root, setup_logging
 
@@ -29,6 +33,65 @@ def get_project_root() -> Path:
     """Get the project root directory."""
     return Path(__file__).parent.parent.resolve()
 
+def extract_with_daemon(daemon, file_path: Path, progress):
+    """
+    Submit extraction to the warm extraction daemon and poll it, showing progress.
+
+    Returns the extracted text and, for a new version of an earlier upload,
+    what changed since then (as `IncrementalExtraction.to_dict()`, else None).
+    """
+    try:
+        job_id = daemon.submit(file_path)
+        logger.info(f"Submitted {file_path.name} to extraction daemon as job {job_id[:8]}")
+        while True:
+            job = daemon.status(job_id)
+            if not job["ok"]:
+                raise Exception(job["error"])
+            if job["status"] == "done":
+                if not job["complete"]:
+                    warn_partial_extraction(job["stop_reason"], job["segments"])
+                job = daemon.status(job_id, include_text=True)
+                return job["text"], job["changes"]
+            if job["status"] in ("failed", "cancelled"):
+                raise Exception(job["error"])
+            if job["status"] == "queued":
+                progress.text("Waiting for a free extraction worker...")
+            elif job["preview"]:
+                progress.text(f"Extracted {job['segments']} segment(s) so far...\n\n{job['preview']}")
+            time.sleep(0.5)
+    finally:
+        daemon.close()
+
+def warn_partial_extraction(stop_reason: str, segment_count: int):
+    """Tell the user extraction was cut short and only part of the file was extracted."""
+    reasons = {
+        "timeout": "it ran out of time",
+        "memory": "it exceeded its memory budget",
+        "cancelled": "it was cancelled",
+    }
+    st.warning(
+        f"Extraction stopped early because {reasons.get(stop_reason, stop_reason)}. "
+        f"Results below cover only the {segment_count} segment(s) finished before that."
+    )
+
+def show_streaming(stream, language: str) -> str:
+    """Render an LLM completion as it is generated and return its final text once done."""
+    placeholder = st.empty()
+    shown = ""
+    last_render = 0.0
+    try:
+        for piece in stream:
+            shown += piece
+            # Each redraw resends the whole block to the browser, so redraw at most ~10 times a second
+            if time.monotonic() - last_render >= 0.1:
+                placeholder.code(shown, language=language)
+                last_render = time.monotonic()
+    finally:
+        # Closes the response if rendering failed part-way
+        stream.close()
+    placeholder.empty()
+    return stream.text
+
 def initialize_session_state():
     """Initializes session state variables if they don't exist."""
     if "extracted_text" not in st.session_state:
@@ -41,6 +104,8 @@ def initialize_session_state():
         st.session_state.test_results = None
     if "automation_script" not in st.session_state:
         st.session_state.automation_script = ""
+    if "extraction_changes" not in st.session_state:
+        st.session_state.extraction_changes = None
 
 # --- Main App ---
 def main():
@@ -111,6 +176,7 @@ def display_file_analysis():
         st.session_state.test_cases = ""
         st.session_state.automation_script = ""
         st.session_state.test_results = None
+        st.session_state.extraction_changes = None
         logger.info("New file uploaded. Session state has been reset.")
 
         # Save uploaded file
@@ -123,9 +189,41 @@ def display_file_analysis():
         # Automatically trigger analysis after upload
         with st.spinner("Analyzing file... This may take a moment."):
             try:
-                # Extract text
+                # Extract text, showing each page/paragraph/chunk as soon as it is ready
                 logger.info(f"Starting analysis for {uploaded_file.name}")
-                extracted_text = extract_text_from_file(file_path)
+                progress = st.empty()
+                daemon = connect_to_daemon()
+                if daemon is not None:
+                    # The daemon re-extracts incrementally and records manifests just like the branch below
+                    extracted_text, st.session_state.extraction_changes = extract_with_daemon(daemon, file_path, progress)
+                else:
+                    segments = []
+
+                    def show_segment(segment):
+                        segments.append(segment)
+                        if segment.text:
+                            # Only the tail is redrawn so long documents don't re-render everything per segment
+                            preview = join_segments(segments[-20:])[-2000:]
+                            progress.text(f"Extracted {len(segments)} segment(s) so far...\n\n{preview}")
+
+                    # Heavy formats run in a killable sandbox under per-format time and memory budgets
+                    if has_manifest(file_path):
+                        # A previous version of this document was extracted: only redo what changed
+                        progress.text("Comparing with the previous upload...")
+                        incremental = extract_incremental(file_path, on_segment=show_segment)
+                        extracted_text = incremental.text
+                        if incremental.complete:
+                            st.session_state.extraction_changes = incremental.to_dict()
+                        else:
+                            warn_partial_extraction(incremental.stop_reason, len(incremental.units))
+                    else:
+                        outcome = extract_with_limits(file_path, on_segment=show_segment)
+                        extracted_text = outcome.text
+                        if outcome.complete:
+                            record_manifest(file_path, outcome.segments)
+                        else:
+                            warn_partial_extraction(outcome.stop_reason, len(outcome.segments))
+                progress.empty()
                 st.session_state.extracted_text = extracted_text
                 
                 # Save extracted text
@@ -134,6 +232,10 @@ def display_file_analysis():
                 with open(extracted_file, "w", encoding="utf-8") as f:
                     f.write(extracted_text)
                 logger.info(f"Extracted text saved to {extracted_file}")
+                # Recordings also keep their timestamped segments, so parts can be revisited without re-transcribing
+                from logic.transcript import save_transcript_beside  # imports numpy; keep it out of app start-up
+
+                save_transcript_beside(file_path, extracted_file)
 
                 # Check for API key before calling LLM
                 if not os.getenv("GROQ_API_KEY"):
@@ -141,14 +243,13 @@ def display_file_analysis():
                     st.session_state.summary = "Analysis skipped: API key missing."
                     st.session_state.test_cases = "Analysis skipped: API key missing."
                 else:
-                    # Generate summary and test cases
-                    summary = summarize_text(st.session_state.extracted_text)
-                    st.session_state.summary = summary
-                    logger.info("Text summarized successfully")
-
-                    test_cases = generate_test_cases(st.session_state.extracted_text)
+                    # The summary is generated in the background while the test cases stream in,
+                    # both under one shared time budget
+                    test_case_stream, summary = stream_analysis(st.session_state.extracted_text)
+                    test_cases = show_streaming(test_case_stream, "gherkin")
+                    st.session_state.summary = summary()
                     st.session_state.test_cases = test_cases
-                    logger.info("Test cases generated successfully.")
+                    logger.info("Summary and test cases generated.")
             
             except Exception as e:
                 st.error(f"Failed during analysis: {str(e)}")
@@ -162,6 +263,24 @@ def display_file_analysis():
         st.subheader("Extracted Text")
         st.text_area("Extracted Content", st.session_state.extracted_text, height=150)
 
+        changes = st.session_state.extraction_changes
+        if changes is not None and changes["has_previous"]:
+            st.subheader("Changes Since Last Upload")
+            counts = changes["summary"]
+            st.markdown(
+                f"**{counts['changed']}** changed, **{counts['added']}** added, **{counts['removed']}** removed, "
+                f"{counts['unchanged']} unchanged ({counts['extracted']} re-extracted, {counts['reused']} reused)"
+            )
+            if changes["changes"]:
+                with st.expander("Show changes"):
+                    for change in changes["changes"][:100]:
+                        where = f"page {change['page']}" if change["page"] else f"{change['kind']} {change['new_index'] if change['new_index'] is not None else change['old_index']}"
+                        st.markdown(f"**{change['op'].title()}** ({where})")
+                        if change["old_text"]:
+                            st.text(f"- {change['old_text'][:500]}")
+                        if change["new_text"]:
+                            st.text(f"+ {change['new_text'][:500]}")
+
         # Display summary
         st.subheader("AI-Generated Summary")
         if st.session_state.summary:
@@ -195,7 +314,8 @@ def display_automated_tests():
             st.error("Groq API key not configured. Please add it in the sidebar.")
         else:
             with st.spinner("AI is writing the automation script..."):
-                script = generate_automation_script(st.session_state.test_cases)
+                # Show the code as it is written; the stored script is the cleaned final version
+                script = show_streaming(stream_automation_script(st.session_state.test_cases), "python")
                 st.session_state.automation_script = script
 
     if st.session_state.automation_script: